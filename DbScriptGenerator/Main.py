@@ -2,6 +2,18 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import re
 import os
+import sys
+import csv
+import argparse
+import datetime
+import functools
+import glob
+import hashlib
+import json
+import yaml
+import jinja2
+import psycopg2  # Make sure to install with: pip install psycopg2-binary
+from concurrent.futures import ProcessPoolExecutor
 
 # --- Configuration: Common GaussDB Data Types ---
 GAUSSDB_DATATYPES = [
@@ -13,10 +25,96 @@ GAUSSDB_DATATYPES = [
 
 NULLABILITY_OPTIONS = ["NULL", "NOT NULL"]
 
+# --- DDL output layouts (Jinja2 templates, compiled once per process) ---
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# --- Schema snapshots: local copies of the column catalog, used for complete rollback scripts ---
+SCHEMA_SNAPSHOT_DIR = "schema_snapshots"
+
+# One round-trip per schema: every column of every table with its full type, nullability, default and comment
+SCHEMA_SNAPSHOT_QUERY = """
+SELECT c.relname, a.attname, pg_catalog.format_type(a.atttypid, a.atttypmod), a.attnotnull,
+       pg_catalog.pg_get_expr(d.adbin, d.adrelid), pg_catalog.col_description(c.oid, a.attnum)
+FROM pg_catalog.pg_attribute a
+JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+WHERE n.nspname = %s
+  AND c.relkind IN ('r', 'p')
+  AND a.attnum > 0
+  AND NOT a.attisdropped
+ORDER BY c.relname, a.attnum
+"""
+
+# --- Batch specs: columns a CSV spec must have (the others are optional) ---
+CSV_SPEC_REQUIRED_HEADERS = ("table", "action", "column")
+
+# --- Release bundle: every table of a batch combined into one ordered deploy and rollback script ---
+RELEASE_BUNDLE_DIR = "release_bundle"
+RELEASE_BUNDLE_BUFFER_SIZE = 1024 * 1024
+
+# Phase order of each bundle. Rollback runs in reverse: the original triggers replace the deployed ones
+# (which reference the added columns) before those columns are dropped; restored-column comments come
+# after the ALTERs that re-add those columns.
+RELEASE_BUNDLE_PHASES = {
+    "deploy": ("alter", "comment", "trigger"),
+    "rollback": ("trigger", "alter", "comment"),
+}
+
+# --- Trigger index: CREATE TRIGGER/FUNCTION definitions of a project's SQL tree, refreshed by file mtime ---
+# One index file per project (named after a hash of its path), kept with the tool rather than in the project
+TRIGGER_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trigger_index_cache")
+TRIGGER_INDEX_VERSION = 2
+# Generated output is not a trigger source, and rollback scripts hold the triggers a release replaced
+TRIGGER_INDEX_EXCLUDED_DIRS = {"next_sit_release", "rollback", ".git"}
+# When several files define a trigger, files under this folder (the released DDL) beat the base scripts,
+# and among them the release folder that sorts last by name (numbers compared as numbers) is the current one
+TRIGGER_INDEX_RELEASES_DIR = "deployment"
+
+# CREATE [OR REPLACE] TRIGGER name <timing and events> ON [schema.]table, matched on raw bytes
+TRIGGER_DEFINITION_REGEX = re.compile(
+    rb'^[ \t]*CREATE\s+(?:OR\s+REPLACE\s+)?TRIGGER\s+["\']?(\w+)["\']?([^;]*?)'
+    rb'\bON\s+(?:["\']?\w+["\']?\.)?["\']?(\w+)', flags=re.IGNORECASE | re.MULTILINE)
+TRIGGER_EVENT_REGEX = re.compile(rb'\b(INSERT|UPDATE|DELETE)\b', flags=re.IGNORECASE)
+# Trigger function of a trigger (EXECUTE PROCEDURE|FUNCTION [schema.]name(...)) and its CREATE FUNCTION
+TRIGGER_FUNCTION_CALL_REGEX = re.compile(
+    rb'\bEXECUTE\s+(?:PROCEDURE|FUNCTION)\s+(?:["\']?\w+["\']?\.)?["\']?(\w+)', flags=re.IGNORECASE)
+FUNCTION_DEFINITION_REGEX = re.compile(
+    rb'^[ \t]*CREATE\s+(?:OR\s+REPLACE\s+)?(?:FUNCTION|PROCEDURE)\s+(?:["\']?\w+["\']?\.)?["\']?(\w+)',
+    flags=re.IGNORECASE | re.MULTILINE)
+DOLLAR_QUOTE_REGEX = re.compile(rb'\$(\w*)\$')
+# A definition ends at the next statement that starts a line (or at the end of the file)
+TRIGGER_DEFINITION_END_REGEX = re.compile(rb'^[ \t]*(?:CREATE|DROP|ALTER|COMMENT)\b',
+                                          flags=re.IGNORECASE | re.MULTILINE)
+TRIGGER_EVENT_TYPES = {"INSERT": "tji", "UPDATE": "tju", "DELETE": "tjd"}
+
 # --- Global variable to track editing state ---
 editing_item_id = None
 
 
+# --- Column Model ---
+
+class ColumnDefinition:
+    """One column to ADD. The authoritative record behind a row of the columns treeview."""
+    __slots__ = ("name", "data_type", "size", "nullability", "comment")
+
+    def __init__(self, name, data_type, size="", nullability="NULL", comment=""):
+        self.name = name
+        self.data_type = data_type
+        self.size = size
+        self.nullability = nullability
+        self.comment = comment
+
+    def as_row(self):
+        """Values shown in the treeview row."""
+        return (self.name, self.data_type, self.size, self.nullability, self.comment)
+
+
+# Treeview item id -> ColumnDefinition, in list order. SQL generation only reads this model;
+# the treeview is just its view.
+column_model = {}
+
+
 # --- Core Functions ---
 
 def handle_comment_tab(event):
@@ -33,6 +131,38 @@ def browse_output_location():
         output_location_entry.insert(0, directory)
 
 
+def load_triggers_from_project():
+    """Fills the TJI/TJU/TJD boxes with the table's current triggers from the project's trigger index."""
+    table_name = table_name_entry.get().strip().upper()
+    project_path = output_location_entry.get().strip()
+    if not table_name or not project_path:
+        messagebox.showwarning("Input Error", "Please enter a Table Name and an Output Project Location.")
+        return
+
+    try:
+        triggers = load_table_triggers(project_path, build_trigger_lookup(refresh_trigger_index(project_path)),
+                                       table_name)
+    except (OSError, UnicodeDecodeError) as e:
+        messagebox.showerror("File Error", f"Could not read the project's triggers:\n{e}")
+        return
+
+    for trigger_type, text_widget in (("tji", tji_text), ("tju", tju_text), ("tjd", tjd_text)):
+        text_widget.delete("1.0", "end")
+        text_widget.insert("1.0", triggers[trigger_type])
+    if not any(triggers.values()):
+        messagebox.showinfo("Triggers", f"No triggers of {table_name} found in the project.")
+
+
+def browse_snapshot_file():
+    """Opens a dialog to select a schema snapshot file."""
+    initial_dir = SCHEMA_SNAPSHOT_DIR if os.path.isdir(SCHEMA_SNAPSHOT_DIR) else None
+    file_path = filedialog.askopenfilename(initialdir=initial_dir,
+                                           filetypes=[("Schema Snapshot", "*.json"), ("All Files", "*.*")])
+    if file_path:
+        snapshot_entry.delete(0, "end")
+        snapshot_entry.insert(0, file_path)
+
+
 def reset_to_add_mode():
     """Resets the input fields and buttons to 'Add' mode."""
     global editing_item_id
@@ -124,7 +254,8 @@ def add_columns_to_list():
                                    f"Nullability for column '{col_name}' (item {i + 1}) must be 'NULL' or 'NOT NULL'.")
             return
 
-        columns_tree.insert("", "end", values=(col_name, col_type, col_size, col_null, col_comment))
+        column = ColumnDefinition(col_name, col_type, col_size, col_null, col_comment)
+        column_model[columns_tree.insert("", "end", values=column.as_row())] = column
 
     # --- Don't reset fields ---
 
@@ -148,7 +279,13 @@ def update_selected_column():
         messagebox.showwarning("Input Error", "Nullability must be 'NULL' or 'NOT NULL'.")
         return
 
-    columns_tree.item(editing_item_id, values=(col_name, col_type, col_size, col_null, col_comment))
+    column = column_model[editing_item_id]
+    column.name = col_name
+    column.data_type = col_type
+    column.size = col_size
+    column.nullability = col_null
+    column.comment = col_comment
+    columns_tree.item(editing_item_id, values=column.as_row())
     reset_to_add_mode()  # Update still resets to add mode
 
 
@@ -162,16 +299,16 @@ def load_selected_for_editing(event):
     item_id = selected_items[0]
     editing_item_id = item_id
 
-    col_name, col_type, col_size, col_null, col_comment = columns_tree.item(item_id, 'values')
+    column = column_model[item_id]
 
     col_name_entry.delete(0, "end")
-    col_name_entry.insert(0, col_name)
-    datatype_combo.set(col_type)
+    col_name_entry.insert(0, column.name)
+    datatype_combo.set(column.data_type)
     size_entry.delete(0, "end")
-    size_entry.insert(0, col_size)
-    nullability_combo.set(col_null)
+    size_entry.insert(0, column.size)
+    nullability_combo.set(column.nullability)
     comment_text.delete("1.0", "end")
-    comment_text.insert("1.0", col_comment)
+    comment_text.insert("1.0", column.comment)
 
     add_button.config(text="Update Selected Column", command=update_selected_column)
     cancel_edit_button.grid(row=5, column=0, sticky="w", padx=5, pady=5)
@@ -186,6 +323,7 @@ def remove_selected_column():
 
     for item in selected_items:
         columns_tree.delete(item)
+        column_model.pop(item, None)
 
     if editing_item_id in selected_items:
         reset_to_add_mode()
@@ -193,138 +331,396 @@ def remove_selected_column():
 
 # --- SQL Generation Helpers (Refactored for J-Table) ---
 
-def build_alter_statements(target_table_name):
-    """Builds the ADD, COMMENT, and DROP statements for a given table name."""
-    add_clauses, comment_sqls, drop_clauses = [], [], []
+def sql_string(value):
+    """Jinja2 filter: escapes a value for use inside a single-quoted SQL literal."""
+    return str(value).replace("'", "''")
+
+
+@functools.lru_cache(maxsize=None)
+def get_template_environment():
+    """One Jinja2 environment per process for the DDL templates."""
+    environment = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATE_DIR), trim_blocks=True,
+                                     lstrip_blocks=True, keep_trailing_newline=False, undefined=jinja2.StrictUndefined)
+    environment.filters["sql_string"] = sql_string
+    return environment
+
+
+@functools.lru_cache(maxsize=None)
+def get_template(name):
+    """Returns the compiled template; each template is loaded and compiled once per process."""
+    return get_template_environment().get_template(name)
+
+
+def render_sql(template_name, **context):
+    """Renders one statement block (without trailing newline)."""
+    return get_template(template_name).render(**context).rstrip("\n")
+
+
+def build_table_change(target_table_name, add_columns, drop_names, schema_snapshot=None):
+    """
+    Structured change model of one table, rendered by the DDL templates.
+    add_columns: ColumnDefinition records; drop_names: column names.
+    Dropped columns are looked up in schema_snapshot for their rollback definition. A NOT NULL column
+    without a known DEFAULT cannot be re-added to a populated table, so it is restored as NULL and
+    flagged with "restore_not_null" (the script tells how to put the constraint back).
+    """
+    columns_to_add = []
+    for column in add_columns:
+        columns_to_add.append({
+            "name": column.name,
+            "full_type": column.data_type + (column.size or ""),
+            "nullability": column.nullability,
+            "comment": column.comment.replace("\t", "    ") if column.comment else "",
+        })
+
+    columns_to_restore = []
+    for name in drop_names:
+        definition = lookup_column_definition(schema_snapshot, target_table_name, name)
+        default = definition.get("default") if definition else None
+        restore_not_null = bool(definition and definition["not_null"] and default is None)
+        columns_to_restore.append({
+            "name": name,
+            "data_type": definition["data_type"] if definition else None,
+            "default": default,
+            "nullability": ("NOT NULL" if definition["not_null"] and not restore_not_null else "NULL")
+            if definition else None,
+            "restore_not_null": restore_not_null,
+            "comment": (definition.get("comment") or "") if definition else "",
+        })
+
+    return {
+        "table": target_table_name,
+        "add_columns": columns_to_add,
+        "drop_columns": list(drop_names),
+        "restore_columns": columns_to_restore,
+    }
+
+
+def build_alter_statements(table_change):
+    """Builds the ADD, COMMENT, and DROP statements of a table change as (category, sql) pairs."""
+    table = table_change["table"]
     sql_script_parts = []
 
-    # 1. Get Columns to ADD
-    all_add_columns = columns_tree.get_children()
-    for item_id in all_add_columns:
-        col_name, col_type, col_size, col_null, col_comment = columns_tree.item(item_id, 'values')
-        full_type = col_type
-        if col_size:
-            full_type += col_size
-        add_clauses.append(f"ADD {col_name} {full_type} {col_null}")
-
-        if col_comment:
-            safe_comment = col_comment.replace("\t", "    ")
-            escaped_comment = safe_comment.replace("'", "''")
-            comment_sqls.append(f"COMMENT ON COLUMN {target_table_name}.{col_name} IS '{escaped_comment}';")
-
-    # 2. Get Columns to DROP
-    drop_cols_str = drop_columns_entry.get().strip()
-    if drop_cols_str:
-        drop_names = [name.strip() for name in drop_cols_str.split(',') if name.strip()]
-        for name in drop_names:
-            drop_clauses.append(f"DROP COLUMN {name}")
-
-    # 3. Assemble
-    if add_clauses:
-        add_sql = f"ALTER TABLE {target_table_name}\n"
-        add_sql += ",\n".join(add_clauses)
-        add_sql += ";"
-        sql_script_parts.append(add_sql)
-
-    if comment_sqls:
-        comment_sql_block = "\n".join(comment_sqls)
-        sql_script_parts.append(comment_sql_block)
-
-    if drop_clauses:
-        drop_sql = f"ALTER TABLE {target_table_name}\n"
-        drop_sql += ",\n".join(drop_clauses)
-        drop_sql += ";"
-        sql_script_parts.append(drop_sql)
+    if table_change["add_columns"]:
+        sql_script_parts.append(("alter", render_sql("add_columns.sql.j2", table=table,
+                                                     columns=table_change["add_columns"])))
+
+    commented = [column for column in table_change["add_columns"] if column["comment"]]
+    if commented:
+        sql_script_parts.append(("comment", render_sql("column_comments.sql.j2", table=table, columns=commented)))
+
+    if table_change["drop_columns"]:
+        sql_script_parts.append(("alter", render_sql("drop_columns.sql.j2", table=table,
+                                                     columns=table_change["drop_columns"])))
 
     return sql_script_parts
 
 
-def build_rollback_statements(target_table_name):
-    """Builds the inverse (rollback) statements for a given table name."""
+def build_rollback_statements(table_change):
+    """
+    Builds the inverse (rollback) statements of a table change as (category, sql) pairs.
+    Dropped columns are re-added with their snapshot definition and comment when known;
+    otherwise placeholders are emitted.
+    """
+    table = table_change["table"]
     sql_script_parts = []
 
     # 1. Rollback for "Columns to ADD" -> DROP COLUMN
-    all_add_columns = columns_tree.get_children()
-    drop_clauses = []
-    if all_add_columns:
-        for item_id in all_add_columns:
-            col_name = columns_tree.item(item_id, 'values')[0]
-            drop_clauses.append(f"DROP COLUMN {col_name}")
-
-        if drop_clauses:
-            drop_sql = f"ALTER TABLE {target_table_name}\n"
-            drop_sql += ",\n".join(drop_clauses)
-            drop_sql += ";"
-            sql_script_parts.append(drop_sql)
-
-    # 2. Rollback for "Columns to DROP" -> ADD COLUMN (with placeholders)
-    drop_cols_str = drop_columns_entry.get().strip()
-    add_clauses = []
-    if drop_cols_str:
-        drop_names = [name.strip() for name in drop_cols_str.split(',') if name.strip()]
-        for name in drop_names:
-            add_clauses.append(f"ADD {name} /*<data_type>*/ /*<NULL|NOT NULL>*/")
-
-        if add_clauses:
-            add_sql = f"-- NOTE: You must fill in the <data_type> and <nullability> for these columns.\n"
-            add_sql += f"ALTER TABLE {target_table_name}\n"
-            add_sql += ",\n".join(add_clauses)
-            add_sql += ";"
-            sql_script_parts.append(add_sql)
+    if table_change["add_columns"]:
+        added_names = [column["name"] for column in table_change["add_columns"]]
+        sql_script_parts.append(("alter", render_sql("drop_columns.sql.j2", table=table, columns=added_names)))
+
+    # 2. Rollback for "Columns to DROP" -> ADD COLUMN (real definition, or placeholders)
+    if table_change["restore_columns"]:
+        sql_script_parts.append(("alter", render_sql("restore_columns.sql.j2", table=table,
+                                                     columns=table_change["restore_columns"])))
+
+    commented = [column for column in table_change["restore_columns"] if column["comment"]]
+    if commented:
+        sql_script_parts.append(("comment", render_sql("column_comments.sql.j2", table=table, columns=commented)))
 
     return sql_script_parts
 
 
+# --- Schema Snapshot Helpers ---
+
+def pull_schema_snapshot(schemas, snapshot_dir=SCHEMA_SNAPSHOT_DIR, **conn_params):
+    """
+    Reads the column catalog of the given schemas (one query per schema) and stores it as
+    <snapshot_dir>/<database>_<YYYYmmddHHMMSS>.json. Returns the snapshot file path.
+    conn_params are passed to psycopg2.connect (host, port, database, user, password).
+    """
+    tables = {}
+    conn = psycopg2.connect(gssencmode='disable', sslmode='prefer', **conn_params)
+    try:
+        with conn.cursor() as cursor:
+            for schema in schemas:
+                cursor.execute(SCHEMA_SNAPSHOT_QUERY, (schema,))
+                for table_name, col_name, data_type, not_null, default, comment in cursor.fetchall():
+                    # The first schema listed wins when a table name exists in several schemas
+                    columns = tables.setdefault(table_name.upper(), {"schema": schema, "columns": {}})
+                    if columns["schema"] != schema:
+                        continue
+                    columns["columns"][col_name.upper()] = {
+                        "name": col_name, "data_type": data_type, "not_null": bool(not_null), "default": default,
+                        "comment": comment,
+                    }
+    finally:
+        conn.close()
+
+    database = conn_params.get("database") or conn_params.get("dbname") or "db"
+    taken_at = datetime.datetime.now()
+    snapshot = {
+        "database": database,
+        "host": conn_params.get("host"),
+        "port": conn_params.get("port"),
+        "schemas": list(schemas),
+        "taken_at": taken_at.isoformat(timespec="seconds"),
+        "tables": tables,
+    }
+    os.makedirs(snapshot_dir, exist_ok=True)
+    snapshot_path = os.path.join(snapshot_dir, f"{database}_{taken_at.strftime('%Y%m%d%H%M%S')}.json")
+    with open(snapshot_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    return snapshot_path
+
+
+def find_latest_snapshot(database, snapshot_dir=SCHEMA_SNAPSHOT_DIR):
+    """Returns the newest snapshot file of database in snapshot_dir, or None."""
+    candidates = glob.glob(os.path.join(glob.escape(snapshot_dir), f"{glob.escape(database)}_*.json"))
+    # File names end with a sortable timestamp
+    return max(candidates) if candidates else None
+
+
+def load_schema_snapshot(snapshot_path):
+    """Loads a snapshot file; "" or None -> None (no snapshot)."""
+    if not snapshot_path:
+        return None
+    with open(snapshot_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def slice_schema_snapshot(schema_snapshot, table_names):
+    """The snapshot reduced to the given tables (same shape), e.g. to send one table's part to a worker."""
+    if not schema_snapshot:
+        return None
+    tables = schema_snapshot["tables"]
+    return {"tables": {name.upper(): tables[name.upper()] for name in table_names if name.upper() in tables}}
+
+
+def lookup_column_definition(schema_snapshot, table_name, column_name):
+    """
+    Returns {"data_type", "not_null", "default", "comment"} of a column in the snapshot, or None.
+    Snapshots taken before defaults were recorded have no "default" key.
+    """
+    if not schema_snapshot:
+        return None
+    table = schema_snapshot["tables"].get(table_name.upper())
+    if table is None:
+        return None
+    return table["columns"].get(column_name.upper())
+
+
+# --- Trigger Index Helpers ---
+
+def find_definition_end(data, start):
+    """
+    End byte of the definition starting at start: the next statement that starts a line, searched after
+    the closing tag of a dollar-quoted body ($$ ... $$) when the definition has one.
+    """
+    end_match = TRIGGER_DEFINITION_END_REGEX.search(data, start)
+    quote_match = DOLLAR_QUOTE_REGEX.search(data, start)
+    if quote_match and (not end_match or quote_match.start() < end_match.start()):
+        closing = data.find(quote_match.group(0), quote_match.end())
+        if closing != -1:
+            end_match = TRIGGER_DEFINITION_END_REGEX.search(data, closing + len(quote_match.group(0)))
+    return end_match.start() if end_match else len(data)
+
+
+def scan_trigger_definitions(file_path):
+    """
+    Scans one SQL file. Returns (triggers, functions):
+        triggers: [[trigger name, TABLE, ["tji"|"tju"|"tjd", ...], start byte, end byte, FUNCTION or None], ...]
+        functions: [[FUNCTION, start byte, end byte], ...]
+    A trigger fired by several events (INSERT OR UPDATE) lists every type; the function is the
+    EXECUTE PROCEDURE target of a trigger whose body lives in a separate CREATE FUNCTION.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    triggers = []
+    for match in TRIGGER_DEFINITION_REGEX.finditer(data):
+        trigger_types = []
+        for event in TRIGGER_EVENT_REGEX.findall(match.group(2)):
+            trigger_type = TRIGGER_EVENT_TYPES[event.upper().decode()]
+            if trigger_type not in trigger_types:
+                trigger_types.append(trigger_type)
+        if not trigger_types:
+            continue
+        end = find_definition_end(data, match.end())
+        call_match = TRIGGER_FUNCTION_CALL_REGEX.search(data, match.end(), end)
+        triggers.append([match.group(1).decode("utf-8", "replace"),
+                         match.group(3).decode("utf-8", "replace").upper(), trigger_types, match.start(), end,
+                         call_match.group(1).decode("utf-8", "replace").upper() if call_match else None])
+    functions = [[match.group(1).decode("utf-8", "replace").upper(), match.start(),
+                  find_definition_end(data, match.end())]
+                 for match in FUNCTION_DEFINITION_REGEX.finditer(data)]
+    return triggers, functions
+
+
+def trigger_index_path(project_path):
+    """Index file of a project in TRIGGER_INDEX_DIR: <project folder name>_<hash of its absolute path>.json."""
+    project_path = os.path.normcase(os.path.abspath(project_path))
+    digest = hashlib.sha1(project_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(TRIGGER_INDEX_DIR, f"{os.path.basename(project_path) or 'root'}_{digest}.json")
+
+
+def refresh_trigger_index(project_path):
+    """
+    Loads the project's index (see trigger_index_path) and brings it up to date: only *.sql files whose
+    mtime or size changed are re-scanned, deleted files are dropped. The index is saved only when
+    something changed. Returns {relative path: {"mtime_ns", "size", "triggers", "functions"}}.
+    """
+    index_path = trigger_index_path(project_path)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        cached_files = index.get("files", {}) if index.get("version") == TRIGGER_INDEX_VERSION else {}
+    except (OSError, ValueError, AttributeError):
+        cached_files = {}
+
+    files = {}
+    changed = False
+    for dir_path, dir_names, file_names in os.walk(project_path):
+        dir_names[:] = [name for name in dir_names if name.lower() not in TRIGGER_INDEX_EXCLUDED_DIRS]
+        for file_name in file_names:
+            if not file_name.lower().endswith(".sql"):
+                continue
+            full_path = os.path.join(dir_path, file_name)
+            rel_path = os.path.relpath(full_path, project_path).replace(os.sep, "/")
+            stat = os.stat(full_path)
+            entry = cached_files.get(rel_path)
+            if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                triggers, functions = scan_trigger_definitions(full_path)
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                         "triggers": triggers, "functions": functions}
+                changed = True
+            files[rel_path] = entry
+
+    if changed or files.keys() != cached_files.keys():
+        os.makedirs(TRIGGER_INDEX_DIR, exist_ok=True)
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump({"version": TRIGGER_INDEX_VERSION, "project": os.path.abspath(project_path),
+                       "files": files}, f)
+    return files
+
+
+def trigger_definition_rank(rel_path, start):
+    """
+    Sort key of a definition: the highest one is current. Released DDL (TRIGGER_INDEX_RELEASES_DIR) beats
+    other files, then the path in natural order ("R10" after "R9"), then the later definition in the file.
+    File mtimes are not used: a checkout or a copied release folder changes them.
+    """
+    folders = [name.lower() for name in rel_path.split("/")[:-1]]
+    natural_path = [[(0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", name)]
+                    for name in rel_path.lower().split("/")]
+    return TRIGGER_INDEX_RELEASES_DIR in folders, natural_path, start
+
+
+def build_trigger_lookup(index_files):
+    """
+    {TABLE: {"tji"|"tju"|"tjd": [(relative path, start, end), ...]}} from the index files: the trigger
+    function's CREATE FUNCTION span (when the project defines it) followed by the CREATE TRIGGER span.
+    When a table's trigger or a function is defined several times, the highest trigger_definition_rank wins.
+    """
+    functions = {}
+    function_ranks = {}
+    for rel_path, entry in index_files.items():
+        for function, start, end in entry["functions"]:
+            rank = trigger_definition_rank(rel_path, start)
+            if function not in function_ranks or rank > function_ranks[function]:
+                function_ranks[function] = rank
+                functions[function] = (rel_path, start, end)
+
+    lookup = {}
+    ranks = {}
+    for rel_path, entry in index_files.items():
+        for _, table, trigger_types, start, end, function in entry["triggers"]:
+            spans = ([functions[function]] if function in functions else []) + [(rel_path, start, end)]
+            rank = trigger_definition_rank(rel_path, start)
+            for trigger_type in trigger_types:
+                key = (table, trigger_type)
+                if key not in ranks or rank > ranks[key]:
+                    ranks[key] = rank
+                    lookup.setdefault(table, {})[trigger_type] = spans
+    return lookup
+
+
+def load_table_triggers(project_path, trigger_lookup, table_name):
+    """Returns {"tji", "tju", "tjd": code} of a table (code is "" when not found), read by byte span."""
+    triggers = {"tji": "", "tju": "", "tjd": ""}
+    for trigger_type, spans in trigger_lookup.get(table_name.upper(), {}).items():
+        parts = []
+        for rel_path, start, end in spans:
+            with open(os.path.join(project_path, rel_path), "rb") as f:
+                f.seek(start)
+                parts.append(f.read(end - start).decode("utf-8").rstrip())
+        triggers[trigger_type] = "\n\n".join(parts)
+    return triggers
+
+
+# One line of a trigger column list or values list: "col", "col,", ", col", "new.col", ", old.col", ...
+TRIGGER_COLUMN_LINE_REGEX = re.compile(r'^\s*(,\s*)?(?:(?:old|new)\.)?(\w+)\s*(,?)\s*$', flags=re.IGNORECASE)
+
+# Anchor lines after which added columns are inserted, per trigger type:
+# {trigger_type: [(anchor line, value prefix or None for the column list, first occurrence only)]}
+TRIGGER_ADD_ANCHORS = {
+    'i': [("BA_IND,", None, False), ("'I',", "new.", False)],
+    'd': [("BA_IND,", None, False), ("'D',", "old.", False)],
+    'u': [("BA_IND,", None, False), ("'B',", "old.", True), ("'A',", "new.", True)],
+}
+
+
 def modify_trigger_code(code, trigger_type, table_name, cols_to_add, cols_to_drop, indent="    "):
     """
     Modifies trigger code to add or remove columns.
+    The code is processed line by line in a single sweep, whatever the number of columns.
     Returns a tuple: (modified_sql, drop_trigger_sql)
     """
     if not code.strip():
         return ("", "")  # Return empty tuple if no code
 
-    modified_code = code
-
-    # --- 1. Handle Dropped Columns ---
-    for col in cols_to_drop:
-        # Regex for column list: optional comma, whitespace, column name, optional comma, whitespace, end-of-line
-        col_list_regex = re.compile(r'^\s*,\s*' + re.escape(col) + r'\b\s*$', flags=re.IGNORECASE | re.MULTILINE)
-        modified_code = col_list_regex.sub('', modified_code)
-        col_list_regex_2 = re.compile(r'^\s*' + re.escape(col) + r'\b,?\s*$\n', flags=re.IGNORECASE | re.MULTILINE)
-        modified_code = col_list_regex_2.sub('', modified_code)
-
-        # Regex for values list: same, but with (old|new)
-        val_list_regex = re.compile(r'^\s*,\s*(old|new)\.' + re.escape(col) + r'\b\s*$',
-                                    flags=re.IGNORECASE | re.MULTILINE)
-        modified_code = val_list_regex.sub('', modified_code)
-        val_list_regex_2 = re.compile(r'^\s*(old|new)\.' + re.escape(col) + r'\b,?\s*$\n',
-                                      flags=re.IGNORECASE | re.MULTILINE)
-        modified_code = val_list_regex_2.sub('', modified_code)
-
-    # --- 2. Handle Added Columns ---
+    drop_set = {col.lower() for col in cols_to_drop}
+
+    # Precompute the lines to insert after each anchor (keyed by the upper-cased anchor line)
+    anchors = {}
     if cols_to_add:
-        col_list_add = '\n' + '\n'.join([f'{indent}{indent}{c},' for c in cols_to_add])
-        val_list_add_i = '\n' + '\n'.join([f'{indent}{indent}new.{c},' for c in cols_to_add])
-        val_list_add_d = '\n' + '\n'.join([f'{indent}{indent}old.{c},' for c in cols_to_add])
-        val_list_add_u_b = '\n' + '\n'.join([f'{indent}{indent}old.{c},' for c in cols_to_add])
-        val_list_add_u_a = '\n' + '\n'.join([f'{indent}{indent}new.{c},' for c in cols_to_add])
-
-        col_list_anchor = re.compile(r'(^\s*BA_IND,\s*$)', flags=re.IGNORECASE | re.MULTILINE)
-
-        if trigger_type == 'i':  # Insert
-            val_list_anchor = re.compile(r"(^\s*'I',\s*$)", flags=re.IGNORECASE | re.MULTILINE)
-            modified_code = col_list_anchor.sub(r'\1' + col_list_add, modified_code)
-            modified_code = val_list_anchor.sub(r'\1' + val_list_add_i, modified_code)
-        elif trigger_type == 'd':  # Delete
-            val_list_anchor = re.compile(r"(^\s*'D',\s*$)", flags=re.IGNORECASE | re.MULTILINE)
-            modified_code = col_list_anchor.sub(r'\1' + col_list_add, modified_code)
-            modified_code = val_list_anchor.sub(r'\1' + val_list_add_d, modified_code)
-        elif trigger_type == 'u':  # Update
-            val_list_anchor_b = re.compile(r"(^\s*'B',\s*$)", flags=re.IGNORECASE | re.MULTILINE)
-            val_list_anchor_a = re.compile(r"(^\s*'A',\s*$)", flags=re.IGNORECASE | re.MULTILINE)
-            modified_code = col_list_anchor.sub(r'\1' + col_list_add, modified_code)
-            modified_code = val_list_anchor_b.sub(r'\1' + val_list_add_u_b, modified_code, count=1)
-            modified_code = val_list_anchor_a.sub(r'\1' + val_list_add_u_a, modified_code, count=1)
+        for anchor, prefix, first_only in TRIGGER_ADD_ANCHORS.get(trigger_type, []):
+            insert_lines = [f"{indent}{indent}{prefix or ''}{c}," for c in cols_to_add]
+            anchors[anchor.upper()] = (insert_lines, first_only)
+
+    out = []
+    for line in code.splitlines(keepends=True):
+        # --- 1. Handle Dropped Columns (column list and old./new. values list lines) ---
+        if drop_set:
+            match = TRIGGER_COLUMN_LINE_REGEX.match(line)
+            # A leading comma and a trailing comma together is not a list entry
+            if match and match.group(2).lower() in drop_set and not (match.group(1) and match.group(3)):
+                continue
+
+        out.append(line)
+
+        # --- 2. Handle Added Columns (insert right after the anchor line) ---
+        anchor = anchors.get(line.strip().upper()) if anchors else None
+        if anchor:
+            insert_lines, first_only = anchor
+            if line.endswith("\n"):
+                out.append("\n".join(insert_lines) + "\n")
+            else:
+                out.append("\n" + "\n".join(insert_lines))
+            if first_only:
+                del anchors[line.strip().upper()]
+
+    modified_code = "".join(out)
 
     # --- 3. Generate DROP statement ---
     drop_statement = ""
@@ -339,19 +735,126 @@ def modify_trigger_code(code, trigger_type, table_name, cols_to_add, cols_to_dro
 
 # --- File I/O Helper ---
 def write_sql_file(file_path, content_parts):
-    """Joins content parts and writes to a file."""
-    # Filter out empty strings
+    """Renders the content parts into one file."""
+    # Filter out empty strings (an empty file gets a "no content" note)
     non_empty_parts = [part for part in content_parts if part and part.strip()]
-    if not non_empty_parts:
-        # Write an empty file if no content
-        content = "-- No SQL content generated for this file. --"
-    else:
-        content = "\n\n".join(non_empty_parts)
+    content = get_template("sql_file.sql.j2").render(parts=non_empty_parts)
 
     with open(file_path, "w", encoding="utf-8") as f:
         f.write(content)
 
 
+def get_output_paths(base_output_path):
+    """Returns (ddl_path, rollback_ddl_path) under the output project location."""
+    ddl_path = os.path.join(base_output_path, "pics3_database", "deployment", "next_sit_release", "ddl")
+    rollback_ddl_path = os.path.join(base_output_path, "pics3_database", "deployment", "next_sit_release",
+                                     "rollback", "ddl")
+    return ddl_path, rollback_ddl_path
+
+
+def generate_table_files(table_name, base_output_path, add_columns, drop_names, original_tji, original_tju,
+                         original_tjd, alter_j_table=True, schema_snapshot=None):
+    """
+    Generates the four SQL files of one table. Raises on I/O errors.
+    Returns {"table", "files", "deploy", "rollback"}: the written file paths and the
+    (category, sql) parts of the table's deploy and rollback, for the release bundle.
+    """
+    ddl_path, rollback_ddl_path = get_output_paths(base_output_path)
+    os.makedirs(ddl_path, exist_ok=True)
+    os.makedirs(rollback_ddl_path, exist_ok=True)
+
+    cols_to_add = [column.name for column in add_columns]
+
+    # Process triggers
+    (mod_tji, drop_tji) = modify_trigger_code(original_tji, 'i', table_name, cols_to_add, drop_names)
+    (mod_tju, drop_tju) = modify_trigger_code(original_tju, 'u', table_name, cols_to_add, drop_names)
+    (mod_tjd, drop_tjd) = modify_trigger_code(original_tjd, 'd', table_name, cols_to_add, drop_names)
+
+    # --- File 1: [table_name].sql (in .../ddl) ---
+    file_1_path = os.path.join(ddl_path, f"{table_name}.sql")
+    table_change = build_table_change(table_name, add_columns, drop_names, schema_snapshot)
+    alter_parts = build_alter_statements(table_change)
+    trigger_parts = [("trigger", part) for part in (drop_tji, mod_tji, drop_tju, mod_tju, drop_tjd, mod_tjd)]
+    write_sql_file(file_1_path, [part for _, part in alter_parts + trigger_parts])
+
+    # --- File 2: [table_name]_rollback.sql (in .../rollback/ddl) ---
+    file_2_path = os.path.join(rollback_ddl_path, f"{table_name}_rollback.sql")
+    rollback_parts = build_rollback_statements(table_change)
+    original_trigger_parts = [("trigger", part) for part in (original_tji, original_tju, original_tjd)]
+    write_sql_file(file_2_path, [part for _, part in rollback_parts + original_trigger_parts])
+
+    # --- File 3: J_[table_name].sql (in .../ddl) ---
+    file_3_path = os.path.join(ddl_path, f"J_{table_name}.sql")
+    j_alter_parts = []
+    if alter_j_table:
+        j_table_change = build_table_change(f"J_{table_name}", add_columns, drop_names, schema_snapshot)
+        j_alter_parts = build_alter_statements(j_table_change)
+    write_sql_file(file_3_path, [part for _, part in j_alter_parts])  # "no triggers"
+
+    # --- File 4: J_[table_name]_rollback.sql (in .../rollback/ddl) ---
+    file_4_path = os.path.join(rollback_ddl_path, f"J_{table_name}_rollback.sql")
+    j_rollback_parts = []
+    if alter_j_table:
+        j_rollback_parts = build_rollback_statements(j_table_change)
+    write_sql_file(file_4_path, [part for _, part in j_rollback_parts])  # "no triggers"
+
+    return {
+        "table": table_name,
+        "files": [file_1_path, file_2_path, file_3_path, file_4_path],
+        "deploy": alter_parts + j_alter_parts + trigger_parts,
+        "rollback": rollback_parts + j_rollback_parts + original_trigger_parts,
+    }
+
+
+# --- Release Bundle ---
+
+def write_release_bundle(base_output_path, table_results):
+    """
+    Combines the parts of every generated table into deploy.sql and rollback.sql plus a manifest.json
+    with their SHA-256 checksums. Parts are bucketed by phase in one pass over the tables, then each
+    bundle is streamed out through a large write buffer while its checksum is computed.
+    Rollback lists the tables in reverse order. Returns the bundle directory.
+    """
+    bundle_path = os.path.join(base_output_path, "pics3_database", "deployment", "next_sit_release",
+                               RELEASE_BUNDLE_DIR)
+    os.makedirs(bundle_path, exist_ok=True)
+
+    manifest = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "tables": [result["table"] for result in table_results],
+        "bundles": {},
+    }
+    for bundle_name, phases in RELEASE_BUNDLE_PHASES.items():
+        results = table_results if bundle_name == "deploy" else table_results[::-1]
+        buckets = {phase: [] for phase in phases}
+        for result in results:
+            for category, part in result[bundle_name]:
+                if part and part.strip():
+                    buckets[category].append((result["table"], part.rstrip()))
+
+        file_name = f"{bundle_name}.sql"
+        digest = hashlib.sha256()
+        size = 0
+        with open(os.path.join(bundle_path, file_name), "wb", buffering=RELEASE_BUNDLE_BUFFER_SIZE) as f:
+            for phase in phases:
+                for table, part in buckets[phase]:
+                    chunk = f"-- [{phase}] {table}\n{part}\n\n".encode("utf-8")
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+
+        manifest["bundles"][bundle_name] = {
+            "file": file_name,
+            "sha256": digest.hexdigest(),
+            "bytes": size,
+            "phases": {phase: len(buckets[phase]) for phase in phases},
+        }
+
+    with open(os.path.join(bundle_path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return bundle_path
+
+
 # --- NEW: Main "Generate All Files" Function ---
 def generate_all_sql_files():
     """Generates all four SQL files based on the user's input."""
@@ -367,20 +870,8 @@ def generate_all_sql_files():
         messagebox.showwarning("Input Error", "Please select an Output Project Location.")
         return
 
-    try:
-        # --- MODIFICATION: Create the new directory structure ---
-        ddl_path = os.path.join(base_output_path, "pics3_database", "deployment", "next_sit_release", "ddl")
-        rollback_ddl_path = os.path.join(base_output_path, "pics3_database", "deployment", "next_sit_release",
-                                         "rollback", "ddl")
-
-        os.makedirs(ddl_path, exist_ok=True)
-        os.makedirs(rollback_ddl_path, exist_ok=True)
-    except Exception as e:
-        messagebox.showerror("File Error", f"Could not create directories:\n{e}")
-        return
-
     # 2. Get columns to add/drop
-    cols_to_add = [columns_tree.item(item_id, 'values')[0] for item_id in columns_tree.get_children()]
+    add_columns = list(column_model.values())
     drop_cols_str = drop_columns_entry.get().strip()
     cols_to_drop = [name.strip() for name in drop_cols_str.split(',') if name.strip()]
 
@@ -389,166 +880,374 @@ def generate_all_sql_files():
     original_tju = tju_text.get("1.0", "end-1c")
     original_tjd = tjd_text.get("1.0", "end-1c")
 
-    # 4. Process triggers
-    (mod_tji, drop_tji) = modify_trigger_code(original_tji, 'i', table_name, cols_to_add, cols_to_drop)
-    (mod_tju, drop_tju) = modify_trigger_code(original_tju, 'u', table_name, cols_to_add, cols_to_drop)
-    (mod_tjd, drop_tjd) = modify_trigger_code(original_tjd, 'd', table_name, cols_to_add, cols_to_drop)
-
-    # --- 5. Build and Write Files ---
+    # 4. Build and Write Files
     try:
-        # --- File 1: [table_name].sql (in .../ddl) ---
-        file_1_path = os.path.join(ddl_path, f"{table_name}.sql")
-        alter_parts = build_alter_statements(table_name)
-        trigger_parts = [drop_tji, mod_tji, drop_tju, mod_tju, drop_tjd, mod_tjd]
-        write_sql_file(file_1_path, alter_parts + trigger_parts)
-
-        # --- File 2: [table_name]_rollback.sql (in .../rollback/ddl) ---
-        file_2_path = os.path.join(rollback_ddl_path, f"{table_name}_rollback.sql")
-        rollback_parts = build_rollback_statements(table_name)
-        original_trigger_parts = [original_tji, original_tju, original_tjd]
-        write_sql_file(file_2_path, rollback_parts + original_trigger_parts)
-
-        # --- File 3: J_[table_name].sql (in .../ddl) ---
-        file_3_path = os.path.join(ddl_path, f"J_{table_name}.sql")
-        j_alter_parts = []
-        if alter_j_table_var.get():
-            j_alter_parts = build_alter_statements(f"J_{table_name}")
-        write_sql_file(file_3_path, j_alter_parts)  # "no triggers"
-
-        # --- File 4: J_[table_name]_rollback.sql (in .../rollback/ddl) ---
-        file_4_path = os.path.join(rollback_ddl_path, f"J_{table_name}_rollback.sql")
-        j_rollback_parts = []
-        if alter_j_table_var.get():
-            j_rollback_parts = build_rollback_statements(f"J_{table_name}")
-        write_sql_file(file_4_path, j_rollback_parts)  # "no triggers"
-
+        schema_snapshot = load_schema_snapshot(snapshot_entry.get().strip())
+        generate_table_files(table_name, base_output_path, add_columns, cols_to_drop,
+                             original_tji, original_tju, original_tjd, alter_j_table_var.get(), schema_snapshot)
     except Exception as e:
         messagebox.showerror("File Error", f"Could not write files:\n{e}")
         return
 
+    ddl_path, rollback_ddl_path = get_output_paths(base_output_path)
     messagebox.showinfo("Success", f"Successfully generated 4 files in:\n{ddl_path}\nand:\n{rollback_ddl_path}")
 
 
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("GaussDB ALTER TABLE Generator")
-root.geometry("900x950")
-
-alter_j_table_var = tk.BooleanVar(value=True)
-
-# --- Top Frame: Table Name ---
-table_frame = ttk.Frame(root, padding="10")
-table_frame.pack(fill="x")
-ttk.Label(table_frame, text="Table Name:", width=15).pack(side="left")
-table_name_entry = ttk.Entry(table_frame)
-table_name_entry.pack(fill="x", expand=True, side="left")
-
-j_table_check = ttk.Checkbutton(table_frame, text="Alter J-Table (J_...)", variable=alter_j_table_var, onvalue=True,
-                                offvalue=False)
-j_table_check.pack(side="left", padx=10)
-
-# --- Input Frame: Column Details ---
-input_frame = ttk.LabelFrame(root, text="Add / Edit Column", padding="10")
-input_frame.pack(fill="x", padx=10)
-# (Input fields: col_name, datatype, size, nullability, comment)
-ttk.Label(input_frame, text="Column Name(s) (comma-separated):").grid(row=0, column=0, sticky="w", padx=5, pady=2)
-col_name_entry = ttk.Entry(input_frame)
-col_name_entry.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
-ttk.Label(input_frame, text="Data Type(s) (comma-separated):").grid(row=1, column=0, sticky="w", padx=5, pady=2)
-datatype_combo = ttk.Combobox(input_frame, values=GAUSSDB_DATATYPES)
-datatype_combo.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
-ttk.Label(input_frame, text="Size(s) (e.g., (5),,(10)):").grid(row=2, column=0, sticky="w", padx=5, pady=2)
-size_entry = ttk.Entry(input_frame)
-size_entry.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
-ttk.Label(input_frame, text="Nullability (comma-separated):").grid(row=3, column=0, sticky="w", padx=5, pady=2)
-nullability_combo = ttk.Combobox(input_frame, values=NULLABILITY_OPTIONS)
-nullability_combo.grid(row=3, column=1, sticky="ew", padx=5, pady=2)
-nullability_combo.set("NULL")
-ttk.Label(input_frame, text="Comment(s) (comma-separated):").grid(row=4, column=0, sticky="nw", padx=5, pady=2)
-comment_text = tk.Text(input_frame, height=3, width=40)
-comment_text.grid(row=4, column=1, sticky="ew", padx=5, pady=2)
-comment_text.bind("<Tab>", handle_comment_tab)
-button_frame = ttk.Frame(input_frame)
-button_frame.grid(row=5, column=1, sticky="e", pady=5)
-cancel_edit_button = ttk.Button(button_frame, text="Cancel Edit", command=reset_to_add_mode)
-cancel_edit_button.pack(side="left", padx=5)
-cancel_edit_button.pack_forget()
-add_button = ttk.Button(button_frame, text="Add Column(s) to List", command=add_columns_to_list)
-add_button.pack(side="left")
-input_frame.columnconfigure(1, weight=1)
-
-# --- Treeview Frame: List of Columns to Add ---
-tree_frame = ttk.LabelFrame(root, text="Columns to ADD (Double-click to edit)", padding=10)
-tree_frame.pack(fill="both", expand=True, padx=10)
-tree_columns = ("Column Name", "Data Type", "Size", "Nullability", "Comment")
-columns_tree = ttk.Treeview(tree_frame, columns=tree_columns, show="headings")
-for col in tree_columns:
-    columns_tree.heading(col, text=col)
-columns_tree.column("Column Name", width=150)
-columns_tree.column("Data Type", width=100)
-columns_tree.column("Size", width=50)
-columns_tree.column("Nullability", width=70)
-columns_tree.column("Comment", width=300)
-scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=columns_tree.yview)
-columns_tree.configure(yscrollcommand=scrollbar.set)
-scrollbar.pack(side="right", fill="y")
-columns_tree.pack(side="left", fill="both", expand=True)
-columns_tree.bind("<Double-1>", load_selected_for_editing)
-remove_button = ttk.Button(tree_frame, text="Remove Selected (from list)", command=remove_selected_column)
-remove_button.pack(side="right", fill="y", padx=5)
-
-# --- Drop Columns Frame ---
-drop_frame = ttk.LabelFrame(root, text="Columns to DROP", padding="10")
-drop_frame.pack(fill="x", padx=10, pady=5)
-ttk.Label(drop_frame, text="Columns to drop (comma-separated):").pack(side="left", padx=5)
-drop_columns_entry = ttk.Entry(drop_frame)
-drop_columns_entry.pack(fill="x", expand=True, side="left")
-
-# --- Trigger Code Frame ---
-trigger_frame = ttk.LabelFrame(root, text="Trigger Code (Optional)", padding="10")
-trigger_frame.pack(fill="x", padx=10, pady=5)
-trigger_paned_window = ttk.PanedWindow(trigger_frame, orient="horizontal")
-trigger_paned_window.pack(fill="x", expand=True)
-# TJI
-tji_frame = ttk.Frame(trigger_paned_window, padding=5)
-ttk.Label(tji_frame, text="TJI Code:").pack(anchor="w")
-tji_text = scrolledtext.ScrolledText(tji_frame, wrap="word", height=10, width=30)
-tji_text.pack(fill="both", expand=True)
-trigger_paned_window.add(tji_frame, weight=1)
-# TJU
-tju_frame = ttk.Frame(trigger_paned_window, padding=5)
-ttk.Label(tju_frame, text="TJU Code:").pack(anchor="w")
-tju_text = scrolledtext.ScrolledText(tju_frame, wrap="word", height=10, width=30)
-tju_text.pack(fill="both", expand=True)
-trigger_paned_window.add(tju_frame, weight=1)
-# TJD
-tjd_frame = ttk.Frame(trigger_paned_window, padding=5)
-ttk.Label(tjd_frame, text="TJD Code:").pack(anchor="w")
-tjd_text = scrolledtext.ScrolledText(tjd_frame, wrap="word", height=10, width=30)
-tjd_text.pack(fill="both", expand=True)
-trigger_paned_window.add(tjd_frame, weight=1)
-
-# --- Output & Generate Frame ---
-output_frame = ttk.LabelFrame(root, text="Output", padding="10")
-output_frame.pack(fill="x", padx=10, pady=5)
-
-ttk.Label(output_frame, text="Output Project Location:").pack(side="left", padx=5)
-output_location_entry = ttk.Entry(output_frame)
-output_location_entry.pack(fill="x", expand=True, side="left", padx=5)
-browse_button = ttk.Button(output_frame, text="Browse", command=browse_output_location)
-browse_button.pack(side="left", padx=5)
-
-# --- Single Generate Button ---
-generate_button_frame = ttk.Frame(root, padding="10")
-generate_button_frame.pack()
-
-generate_all_button = ttk.Button(generate_button_frame, text="Generate All SQL Files", command=generate_all_sql_files,
-                                 style="Accent.TButton")
-generate_all_button.pack(pady=10)
-
-# Add a style for the accent button
-style = ttk.Style()
-style.configure("Accent.TButton", font=("Arial", 10, "bold"))
-
-# --- Start GUI ---
-root.mainloop()
\ No newline at end of file
+# --- Batch (headless) Mode ---
+
+def validate_column(table_name, column):
+    """Raises ValueError for an incomplete ColumnDefinition (same rules as the GUI)."""
+    if not column.name or not column.data_type:
+        raise ValueError(f"{table_name}: Column Name and Data Type are required ({column.as_row()}).")
+    if column.nullability not in NULLABILITY_OPTIONS:
+        raise ValueError(f"{table_name}: Nullability for column '{column.name}' must be 'NULL' or 'NOT NULL'.")
+
+
+def read_trigger_file(path, spec_dir):
+    """Reads a trigger SQL file (relative paths are resolved against the spec file). Empty path -> ""."""
+    if not path:
+        return ""
+    if not os.path.isabs(path):
+        path = os.path.join(spec_dir, path)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_table_specs(spec_path):
+    """
+    Reads a batch spec of many tables. Returns (output location or None, list of table dicts).
+
+    YAML:
+        output: C:/Workspace/project            # optional, --output overrides it
+        tables:
+          - table: TFS_CF_SCHEME
+            alter_j_table: true                 # optional, default true
+            add_columns:
+              - {name: NEW_COL, type: nvarchar2, size: "(50)", nullability: "NULL", comment: "New column"}
+            drop_columns: [OLD_COL]
+            triggers: {tji: triggers/tji_tfs_cf_scheme.sql, tju: ..., tjd: ...}
+
+    CSV (one row per column change, rows grouped by table):
+        table,action,column,data_type,size,nullability,comment,alter_j_table,tji,tju,tjd
+        TFS_CF_SCHEME,ADD,NEW_COL,nvarchar2,(50),NULL,New column,true,triggers/tji.sql,,
+        TFS_CF_SCHEME,DROP,OLD_COL,,,,,,,,
+    """
+    spec_dir = os.path.dirname(os.path.abspath(spec_path))
+    output = None
+    tables = {}
+
+    def get_table(name):
+        name = name.strip().upper()
+        if name not in tables:
+            tables[name] = {"table": name, "alter_j_table": True, "add_columns": [], "drop_columns": [],
+                            "triggers": {"tji": "", "tju": "", "tjd": ""}}
+        return tables[name]
+
+    if spec_path.lower().endswith(".csv"):
+        with open(spec_path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            header = {name.strip().lower() for name in reader.fieldnames or [] if name}
+            missing = [name for name in CSV_SPEC_REQUIRED_HEADERS if name not in header]
+            if missing:
+                raise ValueError(f"{spec_path}: CSV header is missing column(s): {', '.join(missing)}.")
+            for row in reader:
+                row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+                if not any(row.values()):
+                    continue
+                if not row["table"]:
+                    raise ValueError(f"{spec_path} line {reader.line_num}: 'table' is empty.")
+                table = get_table(row["table"])
+                action = row["action"].upper()
+                if action and not row["column"]:
+                    raise ValueError(f"{spec_path} line {reader.line_num}: 'column' is empty for {action}.")
+                if action == "ADD":
+                    table["add_columns"].append(ColumnDefinition(row["column"], row.get("data_type", ""),
+                                                                 row.get("size", ""),
+                                                                 row.get("nullability", "NULL").upper() or "NULL",
+                                                                 row.get("comment", "")))
+                elif action == "DROP":
+                    table["drop_columns"].append(row["column"])
+                elif action:
+                    raise ValueError(f"{table['table']}: Unknown action '{action}' (expected ADD or DROP).")
+                if row.get("alter_j_table"):
+                    table["alter_j_table"] = row["alter_j_table"].lower() in ("1", "true", "yes", "y")
+                for trigger in ("tji", "tju", "tjd"):
+                    if row.get(trigger):
+                        table["triggers"][trigger] = row[trigger]
+    else:
+        with open(spec_path, "r", encoding="utf-8") as f:
+            spec = yaml.safe_load(f) or {}
+        output = spec.get("output")
+        for i, raw in enumerate(spec.get("tables", []), start=1):
+            if not raw.get("table"):
+                raise ValueError(f"{spec_path}: tables entry {i} has no 'table'.")
+            table = get_table(raw["table"])
+            table["alter_j_table"] = bool(raw.get("alter_j_table", True))
+            for col in raw.get("add_columns", []):
+                if not col.get("name"):
+                    raise ValueError(f"{spec_path}: {table['table']} has an add_columns entry without 'name'.")
+                table["add_columns"].append(ColumnDefinition(str(col["name"]), str(col.get("type", "")),
+                                                             str(col.get("size", "") or ""),
+                                                             str(col.get("nullability") or "NULL").upper(),
+                                                             str(col.get("comment", "") or "")))
+            table["drop_columns"].extend(str(name) for name in raw.get("drop_columns", []))
+            table["triggers"].update({k: v or "" for k, v in (raw.get("triggers") or {}).items()})
+
+    for table in tables.values():
+        for column in table["add_columns"]:
+            validate_column(table["table"], column)
+        table["spec_dir"] = spec_dir
+    return output, list(tables.values())
+
+
+def generate_table_from_spec(table, base_output_path, schema_snapshot=None):
+    """
+    Process pool entry point: generate the four files of one spec table.
+    Triggers without a file in the spec come from the project's trigger index ("indexed_triggers").
+    """
+    triggers = table["triggers"]
+    indexed_triggers = table.get("indexed_triggers", {})
+
+    def get_trigger(trigger_type):
+        if triggers.get(trigger_type):
+            return read_trigger_file(triggers[trigger_type], table["spec_dir"])
+        return indexed_triggers.get(trigger_type, "")
+
+    return generate_table_files(
+        table["table"], base_output_path, table["add_columns"], table["drop_columns"],
+        get_trigger("tji"), get_trigger("tju"), get_trigger("tjd"),
+        table["alter_j_table"],
+        schema_snapshot,
+    )
+
+
+def run_batch(spec_path, base_output_path=None, max_workers=None, snapshot_path=None, make_bundle=True):
+    """
+    Generates the files of every table in the spec in parallel.
+    snapshot_path: optional schema snapshot for complete rollback column definitions.
+    make_bundle: also write the release bundle (only when every table succeeded).
+    Returns the number of tables that failed.
+    """
+    spec_output, tables = load_table_specs(spec_path)
+    base_output_path = base_output_path or spec_output
+    if not base_output_path:
+        raise ValueError("No output location: pass --output or set 'output' in the spec.")
+    schema_snapshot = load_schema_snapshot(snapshot_path)
+
+    # Tables missing a trigger file get the project's current trigger (one index refresh for the whole spec)
+    if any(not all(table["triggers"].get(t) for t in ("tji", "tju", "tjd")) for table in tables) \
+            and os.path.isdir(base_output_path):
+        trigger_lookup = build_trigger_lookup(refresh_trigger_index(base_output_path))
+        for table in tables:
+            table["indexed_triggers"] = load_table_triggers(base_output_path, trigger_lookup, table["table"])
+
+    failures = 0
+    table_results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Each task only gets the snapshot entries of its table and J-table, not the whole catalog
+        futures = [executor.submit(generate_table_from_spec, table, base_output_path,
+                                   slice_schema_snapshot(schema_snapshot, (table["table"], f"J_{table['table']}")))
+                   for table in tables]
+        for table, future in zip(tables, futures):
+            try:
+                table_results.append(future.result())
+                print(f"OK     {table['table']}")
+            except Exception as e:
+                failures += 1
+                print(f"FAILED {table['table']}: {e}")
+
+    ddl_path, rollback_ddl_path = get_output_paths(base_output_path)
+    print(f"Generated {len(tables) - failures}/{len(tables)} table(s) in:\n{ddl_path}\nand:\n{rollback_ddl_path}")
+    if failures:
+        print("Release bundle not written: fix the failed table(s) first.")
+    elif make_bundle:
+        print(f"Release bundle written to: {write_release_bundle(base_output_path, table_results)}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GaussDB ALTER TABLE Generator (GUI, or batch mode with --spec).")
+    parser.add_argument("--spec",
+                        help="YAML or CSV spec of many tables; generates headlessly instead of opening the GUI.")
+    parser.add_argument("--output", help="Output Project Location for --spec (overrides 'output' in the spec).")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for --spec.")
+    parser.add_argument("--no-bundle", action="store_true",
+                        help="Skip the combined release deploy/rollback bundle for --spec.")
+    parser.add_argument("--snapshot",
+                        help="Schema snapshot file for rollback column definitions ('latest' = newest of --db-name).")
+    parser.add_argument("--pull-snapshot", action="store_true",
+                        help="Read the column catalog of --schemas from the database into a new snapshot file.")
+    parser.add_argument("--schemas", default="public", help="Comma-separated schemas for --pull-snapshot.")
+    parser.add_argument("--snapshot-dir", default=SCHEMA_SNAPSHOT_DIR, help="Where snapshot files are stored.")
+    parser.add_argument("--db-host", default="localhost")
+    parser.add_argument("--db-port", default="8000")
+    parser.add_argument("--db-name", default="pics_test_merge")
+    parser.add_argument("--db-user")
+    parser.add_argument("--db-password", default=os.environ.get("PGPASSWORD"))
+    args = parser.parse_args()
+
+    snapshot_file = args.snapshot
+    if args.pull_snapshot:
+        try:
+            snapshot_file = pull_schema_snapshot(
+                [schema.strip() for schema in args.schemas.split(',') if schema.strip()], args.snapshot_dir,
+                host=args.db_host, port=args.db_port, database=args.db_name, user=args.db_user,
+                password=args.db_password)
+        except (OSError, psycopg2.Error) as e:
+            print(f"Snapshot Error: {e}")
+            sys.exit(2)
+        print(f"Schema snapshot written to: {snapshot_file}")
+    elif snapshot_file == "latest":
+        snapshot_file = find_latest_snapshot(args.db_name, args.snapshot_dir)
+        if not snapshot_file:
+            print(f"Snapshot Error: no snapshot of {args.db_name} in {args.snapshot_dir}")
+            sys.exit(2)
+
+    if args.spec:
+        try:
+            sys.exit(1 if run_batch(args.spec, args.output, args.workers, snapshot_file, not args.no_bundle) else 0)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"Spec Error: {e}")
+            sys.exit(2)
+    if args.pull_snapshot:
+        sys.exit(0)
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("GaussDB ALTER TABLE Generator")
+    root.geometry("900x950")
+
+    alter_j_table_var = tk.BooleanVar(value=True)
+
+    # --- Top Frame: Table Name ---
+    table_frame = ttk.Frame(root, padding="10")
+    table_frame.pack(fill="x")
+    ttk.Label(table_frame, text="Table Name:", width=15).pack(side="left")
+    table_name_entry = ttk.Entry(table_frame)
+    table_name_entry.pack(fill="x", expand=True, side="left")
+
+    j_table_check = ttk.Checkbutton(table_frame, text="Alter J-Table (J_...)", variable=alter_j_table_var, onvalue=True,
+                                    offvalue=False)
+    j_table_check.pack(side="left", padx=10)
+
+    # --- Input Frame: Column Details ---
+    input_frame = ttk.LabelFrame(root, text="Add / Edit Column", padding="10")
+    input_frame.pack(fill="x", padx=10)
+    # (Input fields: col_name, datatype, size, nullability, comment)
+    ttk.Label(input_frame, text="Column Name(s) (comma-separated):").grid(row=0, column=0, sticky="w", padx=5, pady=2)
+    col_name_entry = ttk.Entry(input_frame)
+    col_name_entry.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
+    ttk.Label(input_frame, text="Data Type(s) (comma-separated):").grid(row=1, column=0, sticky="w", padx=5, pady=2)
+    datatype_combo = ttk.Combobox(input_frame, values=GAUSSDB_DATATYPES)
+    datatype_combo.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
+    ttk.Label(input_frame, text="Size(s) (e.g., (5),,(10)):").grid(row=2, column=0, sticky="w", padx=5, pady=2)
+    size_entry = ttk.Entry(input_frame)
+    size_entry.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
+    ttk.Label(input_frame, text="Nullability (comma-separated):").grid(row=3, column=0, sticky="w", padx=5, pady=2)
+    nullability_combo = ttk.Combobox(input_frame, values=NULLABILITY_OPTIONS)
+    nullability_combo.grid(row=3, column=1, sticky="ew", padx=5, pady=2)
+    nullability_combo.set("NULL")
+    ttk.Label(input_frame, text="Comment(s) (comma-separated):").grid(row=4, column=0, sticky="nw", padx=5, pady=2)
+    comment_text = tk.Text(input_frame, height=3, width=40)
+    comment_text.grid(row=4, column=1, sticky="ew", padx=5, pady=2)
+    comment_text.bind("<Tab>", handle_comment_tab)
+    button_frame = ttk.Frame(input_frame)
+    button_frame.grid(row=5, column=1, sticky="e", pady=5)
+    cancel_edit_button = ttk.Button(button_frame, text="Cancel Edit", command=reset_to_add_mode)
+    cancel_edit_button.pack(side="left", padx=5)
+    cancel_edit_button.pack_forget()
+    add_button = ttk.Button(button_frame, text="Add Column(s) to List", command=add_columns_to_list)
+    add_button.pack(side="left")
+    input_frame.columnconfigure(1, weight=1)
+
+    # --- Treeview Frame: List of Columns to Add ---
+    tree_frame = ttk.LabelFrame(root, text="Columns to ADD (Double-click to edit)", padding=10)
+    tree_frame.pack(fill="both", expand=True, padx=10)
+    tree_columns = ("Column Name", "Data Type", "Size", "Nullability", "Comment")
+    columns_tree = ttk.Treeview(tree_frame, columns=tree_columns, show="headings")
+    for col in tree_columns:
+        columns_tree.heading(col, text=col)
+    columns_tree.column("Column Name", width=150)
+    columns_tree.column("Data Type", width=100)
+    columns_tree.column("Size", width=50)
+    columns_tree.column("Nullability", width=70)
+    columns_tree.column("Comment", width=300)
+    scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=columns_tree.yview)
+    columns_tree.configure(yscrollcommand=scrollbar.set)
+    scrollbar.pack(side="right", fill="y")
+    columns_tree.pack(side="left", fill="both", expand=True)
+    columns_tree.bind("<Double-1>", load_selected_for_editing)
+    remove_button = ttk.Button(tree_frame, text="Remove Selected (from list)", command=remove_selected_column)
+    remove_button.pack(side="right", fill="y", padx=5)
+
+    # --- Drop Columns Frame ---
+    drop_frame = ttk.LabelFrame(root, text="Columns to DROP", padding="10")
+    drop_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Label(drop_frame, text="Columns to drop (comma-separated):").pack(side="left", padx=5)
+    drop_columns_entry = ttk.Entry(drop_frame)
+    drop_columns_entry.pack(fill="x", expand=True, side="left")
+
+    # --- Trigger Code Frame ---
+    trigger_frame = ttk.LabelFrame(root, text="Trigger Code (Optional)", padding="10")
+    trigger_frame.pack(fill="x", padx=10, pady=5)
+    trigger_paned_window = ttk.PanedWindow(trigger_frame, orient="horizontal")
+    trigger_paned_window.pack(fill="x", expand=True)
+    # TJI
+    tji_frame = ttk.Frame(trigger_paned_window, padding=5)
+    ttk.Label(tji_frame, text="TJI Code:").pack(anchor="w")
+    tji_text = scrolledtext.ScrolledText(tji_frame, wrap="word", height=10, width=30)
+    tji_text.pack(fill="both", expand=True)
+    trigger_paned_window.add(tji_frame, weight=1)
+    # TJU
+    tju_frame = ttk.Frame(trigger_paned_window, padding=5)
+    ttk.Label(tju_frame, text="TJU Code:").pack(anchor="w")
+    tju_text = scrolledtext.ScrolledText(tju_frame, wrap="word", height=10, width=30)
+    tju_text.pack(fill="both", expand=True)
+    trigger_paned_window.add(tju_frame, weight=1)
+    # TJD
+    tjd_frame = ttk.Frame(trigger_paned_window, padding=5)
+    ttk.Label(tjd_frame, text="TJD Code:").pack(anchor="w")
+    tjd_text = scrolledtext.ScrolledText(tjd_frame, wrap="word", height=10, width=30)
+    tjd_text.pack(fill="both", expand=True)
+    trigger_paned_window.add(tjd_frame, weight=1)
+    load_triggers_button = ttk.Button(trigger_frame, text="Load Triggers from Project",
+                                      command=load_triggers_from_project)
+    load_triggers_button.pack(anchor="e", pady=(5, 0))
+
+    # --- Output & Generate Frame ---
+    output_frame = ttk.LabelFrame(root, text="Output", padding="10")
+    output_frame.pack(fill="x", padx=10, pady=5)
+
+    ttk.Label(output_frame, text="Output Project Location:").pack(side="left", padx=5)
+    output_location_entry = ttk.Entry(output_frame)
+    output_location_entry.pack(fill="x", expand=True, side="left", padx=5)
+    browse_button = ttk.Button(output_frame, text="Browse", command=browse_output_location)
+    browse_button.pack(side="left", padx=5)
+
+    # --- Schema Snapshot Frame (optional: real column definitions in rollback scripts) ---
+    snapshot_frame = ttk.LabelFrame(root, text="Schema Snapshot (Optional, for rollback of dropped columns)",
+                                    padding="10")
+    snapshot_frame.pack(fill="x", padx=10, pady=5)
+
+    ttk.Label(snapshot_frame, text="Snapshot File:").pack(side="left", padx=5)
+    snapshot_entry = ttk.Entry(snapshot_frame)
+    snapshot_entry.pack(fill="x", expand=True, side="left", padx=5)
+    if snapshot_file:
+        snapshot_entry.insert(0, snapshot_file)
+    snapshot_browse_button = ttk.Button(snapshot_frame, text="Browse", command=browse_snapshot_file)
+    snapshot_browse_button.pack(side="left", padx=5)
+
+    # --- Single Generate Button ---
+    generate_button_frame = ttk.Frame(root, padding="10")
+    generate_button_frame.pack()
+
+    generate_all_button = ttk.Button(generate_button_frame, text="Generate All SQL Files",
+                                     command=generate_all_sql_files, style="Accent.TButton")
+    generate_all_button.pack(pady=10)
+
+    # Add a style for the accent button
+    style = ttk.Style()
+    style.configure("Accent.TButton", font=("Arial", 10, "bold"))
+
+    # --- Start GUI ---
+    root.mainloop()
\ No newline at end of file
@@ -1,28 +1,67 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import psycopg2  # Make sure to install with: pip install psycopg2-binary
-import datetime
+import psycopg2.extensions
+import psycopg2.pool
+import functools
+import math
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configuration ---
+FETCH_BATCH_SIZE = 2000  # Rows per round-trip of the server-side (named) backup cursor
+
+# Tables backed up (and deleted) for the entered IDs: (table name, column the IDs are matched against).
+# Every table that references them through a foreign key (directly or transitively) is added to the
+# backup automatically. All tables are exported concurrently, on one shared snapshot, parents first.
+EXPORT_TABLES = [
+    ("func", "func_id"),
+    ("func_role_priv", "func_id"),
+]
+
+# Placeholder for the ID set in export conditions: "%s" (bound array) when exporting,
+# an ARRAY[...] literal in the DELETE script
+ID_SET_PLACEHOLDER = "{ids}"
+
+# Every foreign key of the database: one row per column pair, in key column order.
+# (generate_series in the select list instead of WITH ORDINALITY/LATERAL, for older GaussDB versions)
+FOREIGN_KEYS_QUERY = """
+SELECT k.con_oid, k.conrelid::regclass::text, k.confrelid::regclass::text,
+       (SELECT attname FROM pg_catalog.pg_attribute WHERE attrelid = k.conrelid AND attnum = k.conkey[k.i]),
+       (SELECT attname FROM pg_catalog.pg_attribute WHERE attrelid = k.confrelid AND attnum = k.confkey[k.i])
+FROM (SELECT oid AS con_oid, conrelid, confrelid, conkey, confkey,
+             generate_series(1, array_length(conkey, 1)) AS i
+      FROM pg_catalog.pg_constraint
+      WHERE contype = 'f') k
+ORDER BY k.con_oid, k.i
+"""
 
+# conn.dsn (password hidden) -> [(child table, parent table, child columns, parent columns)]
+foreign_key_cache = {}
 
-# --- Helper Functions ---
+# Backup script formats: "INSERT" (multi-row INSERT statements, replayable by any SQL client) or
+# "COPY" (COPY ... FROM STDIN blocks streamed by the server: much faster to export and restore, but
+# the backup must be replayed with psql/gsql)
+BACKUP_FORMATS = ["INSERT", "COPY"]
 
-def format_value(val):
-    """
-    Properly formats a Python value for inclusion in a SQL INSERT statement.
-    """
-    if val is None:
-        return "NULL"
-    if isinstance(val, (int, float)):
-        return str(val)
-    if isinstance(val, datetime.datetime):
-        # Format as 'YYYY-MM-DD HH:MI:SS.mmm'
-        return f"'{val.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}'"
-    if isinstance(val, str):
-        # Escape single quotes by doubling them up
-        return f"'{val.replace("'", "''")}'"
-    # Fallback for other types (like bool)
-    return f"'{str(val)}'"
+# INSERT format: rows per INSERT statement (0 = all rows of a table in one statement), and an optional
+# COMMIT after every N statements (0 = no transaction markers), so big backups replay in bounded pieces
+INSERT_ROWS_PER_STATEMENT = 1000
+INSERT_COMMIT_EVERY_STATEMENTS = 0
 
+# Connections are pooled per host/port/database/user and reused across "Generate" clicks
+POOL_MAX_CONNECTIONS = 4
+POOL_IDLE_TIMEOUT_SECONDS = 300  # A pool unused for this long is closed by the periodic sweep
+POOL_SWEEP_INTERVAL_MS = 60 * 1000
+
+# (host, port, database, user) -> {"pool": LazyConnectionPool, "password": str, "last_used": monotonic time}
+connection_pools = {}
+
+
+# --- Helper Functions ---
 
 def format_identifier(col_name):
     """
@@ -31,39 +70,487 @@ def format_identifier(col_name):
     return f'"{col_name}"'
 
 
-def fetch_and_format_inserts(cursor, table_name, func_id_list):
+# --- Per-column Value Formatters (chosen once per query from the column type OIDs) ---
+
+def format_sql_string(val):
+    """Quoted SQL string literal (single quotes doubled)."""
+    return "'" + str(val).replace("'", "''") + "'"
+
+
+def format_bool(val):
+    return "TRUE" if val else "FALSE"
+
+
+def format_integer(val):
+    return str(val)
+
+
+def format_float(val):
+    """repr round-trips exactly; NaN and +/-Infinity are only valid as quoted literals."""
+    return repr(val) if math.isfinite(val) else f"'{val}'"
+
+
+def format_numeric(val):
+    """Decimal keeps its exact digits and scale; NaN is only valid as a quoted literal."""
+    return str(val) if val.is_finite() else f"'{val}'"
+
+
+def format_date(val):
+    return f"'{val.isoformat()}'"
+
+
+def format_time(val):
+    """time / timetz with full microseconds (and the UTC offset for timetz)."""
+    return f"'{val.isoformat(timespec='microseconds')}'"
+
+
+def format_timestamp(val):
+    """timestamp / timestamptz with full microseconds (and the UTC offset for timestamptz)."""
+    return f"'{val.isoformat(sep=' ', timespec='microseconds')}'"
+
+
+def format_bytea(val):
+    r"""bytea (memoryview) as a hex literal: '\x...'."""
+    return f"'\\x{bytes(val).hex()}'"
+
+
+# PostgreSQL/GaussDB type OID -> formatter. Every other type is fetched as the server's text (see below)
+# and written as a quoted string literal.
+COLUMN_FORMATTERS_BY_TYPE_OID = {
+    16: format_bool,                                            # bool
+    17: format_bytea,                                           # bytea
+    20: format_integer, 21: format_integer, 23: format_integer,  # int8, int2, int4
+    26: format_integer,                                         # oid
+    700: format_float, 701: format_float,                       # float4, float8
+    1700: format_numeric,                                       # numeric / decimal
+    1082: format_date,                                          # date
+    1083: format_time, 1266: format_time,                       # time, timetz
+    1114: format_timestamp, 1184: format_timestamp,             # timestamp, timestamptz
+    114: format_sql_string, 3802: format_sql_string,            # json, jsonb
+    2950: format_sql_string,                                    # uuid
+    18: format_sql_string, 19: format_sql_string,               # char, name
+    25: format_sql_string, 1042: format_sql_string, 1043: format_sql_string,  # text, bpchar, varchar
+}
+
+
+# Types psycopg2 would decode into Python objects with no exact formatter above (interval -> timedelta loses
+# its months, arrays -> lists, ranges, json -> dicts, ...) are fetched as their server text instead.
+# Types psycopg2 does not know (GaussDB nvarchar2, enums, ...) already arrive as text.
+BACKUP_TEXT_TYPE = psycopg2.extensions.new_type(
+    tuple(oid for oid in psycopg2.extensions.string_types
+          if COLUMN_FORMATTERS_BY_TYPE_OID.get(oid, format_sql_string) is format_sql_string),
+    "BACKUP_TEXT", lambda value, cursor: value)
+
+
+def build_column_formatters(description):
+    """One formatter per result column, from cursor.description type OIDs (NULLs are handled by the caller)."""
+    return [COLUMN_FORMATTERS_BY_TYPE_OID.get(column.type_code, format_sql_string) for column in description]
+
+
+def render_condition(condition, ids_sql):
+    """Substitutes the ID set placeholder of an export condition."""
+    return condition.replace(ID_SET_PLACEHOLDER, ids_sql)
+
+
+def build_export_query(table_name, condition, order_by):
+    """SELECT of one export; returns (query, number of ID array parameters)."""
+    query = f"SELECT * FROM {table_name} WHERE {render_condition(condition, '%s')} ORDER BY {order_by}"
+    return query, condition.count(ID_SET_PLACEHOLDER)
+
+
+def write_table_inserts(conn, out, table_name, condition, order_by, id_list,
+                        rows_per_statement=INSERT_ROWS_PER_STATEMENT, commit_every=INSERT_COMMIT_EVERY_STATEMENTS):
     """
-    Fetches data for the given IDs and formats it as a SQL INSERT script.
+    Streams the rows of the given IDs into the open file 'out' as a SQL INSERT script.
+    A server-side (named) cursor fetches FETCH_BATCH_SIZE rows at a time and each batch is
+    written as it arrives, so memory stays bounded whatever the row count.
+    A new INSERT statement starts every rows_per_statement rows (0 = one statement); with
+    commit_every, the statements are wrapped in BEGIN/COMMIT blocks of that many statements.
+    Returns the number of rows written. Database errors are raised to the caller.
     """
-    script_lines = []
+    with conn.cursor(name=f"backup_{table_name}") as cursor:
+        # Fetch every type without an exact formatter as its original text (json null != SQL NULL,
+        # interval months, array and range literals all round-trip unchanged)
+        psycopg2.extensions.register_type(BACKUP_TEXT_TYPE, cursor)
 
-    try:
         # Use = ANY(%s) which is an efficient way to handle an IN clause
-        query = f"SELECT * FROM {table_name} WHERE func_id = ANY(%s) ORDER BY func_id"
-        cursor.execute(query, (func_id_list,))
+        query, id_params = build_export_query(table_name, condition, order_by)
+        cursor.execute(query, (id_list,) * id_params)
 
-        rows = cursor.fetchall()
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
         if not rows:
-            script_lines.append(f"-- No data found in {table_name} for the given IDs.\n")
-            return "".join(script_lines)
+            out.write(f"-- No data found in {table_name} for the given IDs.\n")
+            return 0
 
         # Get column names from the cursor description
         col_names = [format_identifier(desc[0]) for desc in cursor.description]
 
-        # Start the INSERT statement
-        script_lines.append(f"INSERT INTO {table_name}\n({', '.join(col_names)})\nVALUES\n")
+        formatters = build_column_formatters(cursor.description)
+        insert_header = f"INSERT INTO {table_name}\n({', '.join(col_names)})\nVALUES\n"
+        if commit_every:
+            out.write("BEGIN;\n")
+
+        # Each row closes the previous one (or the previous statement when it is full),
+        # so the last row can end the statement without lookahead
+        row_count = 0
+        statement_rows = 0
+        statement_count = 0
+        while rows:
+            for row in rows:
+                if statement_rows and statement_rows == rows_per_statement:
+                    out.write(");\n")
+                    statement_rows = 0
+                    statement_count += 1
+                    if commit_every and statement_count % commit_every == 0:
+                        out.write("COMMIT;\nBEGIN;\n")
+                out.write(insert_header + "(" if statement_rows == 0 else "),\n(")
+                out.write(", ".join(["NULL" if val is None else formatter(val)
+                                     for formatter, val in zip(formatters, row)]))
+                statement_rows += 1
+                row_count += 1
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        out.write(");\n")
+        if commit_every:
+            out.write("COMMIT;\n")
+
+    return row_count
+
+
+def write_table_copy(conn, out, table_name, condition, order_by, id_list):
+    """
+    Streams the rows of the given IDs into the open file 'out' as a 'COPY ... FROM STDIN' block.
+    The server formats the rows itself (COPY TO STDOUT) and they are written to the file as they
+    arrive, with no per-value work in Python. Returns the number of rows written.
+    """
+    with conn.cursor() as cursor:
+        # Get column names (no rows) so the restore does not depend on the column order of the target table
+        cursor.execute(f"SELECT * FROM {table_name} LIMIT 0")
+        col_names = [format_identifier(desc[0]) for desc in cursor.description]
 
-        # Process each row
-        for i, row in enumerate(rows):
-            formatted_values = [format_value(val) for val in row]
-            line_end = ");\n" if (i == len(rows) - 1) else "),\n"
-            script_lines.append(f"({', '.join(formatted_values)}{line_end}")
+        # COPY takes no bind parameters: the ID array is inlined by mogrify (still escaped by psycopg2)
+        query, id_params = build_export_query(table_name, condition, order_by)
+        query = cursor.mogrify(query, (id_list,) * id_params)
+        out.write(f"COPY {table_name} ({', '.join(col_names)}) FROM STDIN;\n")
+        cursor.copy_expert(b"COPY (" + query + b") TO STDOUT", out)
+        out.write("\\.\n")
+        return cursor.rowcount
 
-    except (Exception, psycopg2.DatabaseError) as error:
-        messagebox.showerror(f"Database Error ({table_name})", f"Error: {error}")
-        return None  # Indicate failure
 
-    return "".join(script_lines)
+# --- Foreign Key Dependencies ---
+
+def get_foreign_keys(conn):
+    """
+    Returns every foreign key of the connected database as (child, parent, child columns, parent columns),
+    read from pg_constraint in one query the first time and cached afterwards.
+    """
+    foreign_keys = foreign_key_cache.get(conn.dsn)
+    if foreign_keys is None:
+        constraints = {}
+        with conn.cursor() as cursor:
+            cursor.execute(FOREIGN_KEYS_QUERY)
+            for con_oid, child, parent, child_column, parent_column in cursor.fetchall():
+                _, _, child_columns, parent_columns = constraints.setdefault(con_oid, (child, parent, [], []))
+                child_columns.append(child_column)
+                parent_columns.append(parent_column)
+        conn.rollback()  # Leave no transaction open (the export starts its own)
+        foreign_keys = foreign_key_cache[conn.dsn] = list(constraints.values())
+    return foreign_keys
+
+
+def build_export_plan(foreign_keys, tables=EXPORT_TABLES):
+    """
+    Returns [(table, condition, order by)] of the configured tables plus every table that references them
+    through a foreign key, directly or transitively, ordered parents first (the restore order).
+
+    A table referencing a configured table's ID column is selected with '= ANY' on its own key column;
+    deeper tables with one set-based subquery on their parent's condition. A table reached through several
+    keys gets the conditions of all of them joined with OR. In a reference cycle, the first table found
+    only follows the keys of tables already placed before it. Self-references (e.g. a parent menu) are not
+    followed: rows of other IDs that point into the selected rows are not included.
+    """
+    id_columns = dict(tables)
+
+    # Every table reachable from the configured ones, in discovery order
+    discovered = list(id_columns)
+    queue = list(discovered)
+    while queue:
+        parent = queue.pop(0)
+        for child, fk_parent, _, _ in foreign_keys:
+            if fk_parent == parent and child not in discovered:
+                discovered.append(child)
+                queue.append(child)
+
+    # Parents first (Kahn's algorithm, stable in discovery order); self-references are ignored and a
+    # reference cycle is broken by placing its first discovered table
+    parents = {table: set() for table in discovered}
+    for child, parent, _, _ in foreign_keys:
+        if child in parents and parent in parents and child != parent:
+            parents[child].add(parent)
+    ordered = []
+    while len(ordered) < len(discovered):
+        ready = [table for table in discovered if table not in ordered and not parents[table] - set(ordered)]
+        ordered.extend(ready or [next(table for table in discovered if table not in ordered)])
+
+    plan = {}
+    for table in ordered:
+        if table in id_columns:
+            id_column = format_identifier(id_columns[table])
+            plan[table] = (f"{id_column} = ANY({ID_SET_PLACEHOLDER})", id_column)
+            continue
+        conditions, order_by = [], None
+        for child, parent, child_columns, parent_columns in foreign_keys:
+            if child != table or parent not in plan or parent == child:
+                continue
+            child_list = ", ".join(format_identifier(column) for column in child_columns)
+            if parent_columns == [id_columns.get(parent)]:
+                condition = f"{child_list} = ANY({ID_SET_PLACEHOLDER})"
+            else:
+                parent_list = ", ".join(format_identifier(column) for column in parent_columns)
+                condition = f"({child_list}) IN (SELECT {parent_list} FROM {parent} WHERE {plan[parent][0]})"
+            if condition not in conditions:
+                conditions.append(condition)
+            order_by = order_by or child_list
+        if len(conditions) > 1:
+            conditions = [f"({condition})" for condition in conditions]
+        plan[table] = (" OR ".join(conditions), order_by)
+    return [(table, *plan[table]) for table in ordered]
+
+
+# --- Connection Pooling ---
+
+class LazyConnectionPool:
+    """
+    Thread-safe pool that opens connections on demand (none up front) and keeps every returned
+    connection open for reuse, up to maxconn. Same getconn/putconn/closeall calls as psycopg2.pool.
+    """
+
+    def __init__(self, maxconn, **conn_params):
+        self.maxconn = maxconn
+        self.conn_params = conn_params
+        self.idle = []
+        self.in_use = set()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        """Returns an idle connection, or a new one while fewer than maxconn are open."""
+        with self.lock:
+            if self.closed:
+                raise psycopg2.pool.PoolError("connection pool is closed")
+            if self.idle:
+                conn = self.idle.pop()
+            elif len(self.in_use) < self.maxconn:
+                conn = psycopg2.connect(**self.conn_params)
+            else:
+                raise psycopg2.pool.PoolError("connection pool exhausted")
+            self.in_use.add(conn)
+            return conn
+
+    def putconn(self, conn, close=False):
+        """Takes a connection back: kept open for reuse, or closed when asked to (or already closed)."""
+        with self.lock:
+            self.in_use.discard(conn)
+            if close or self.closed or conn.closed:
+                conn.close()
+            else:
+                self.idle.append(conn)
+
+    def closeall(self):
+        """Closes every connection, idle or checked out."""
+        with self.lock:
+            self.closed = True
+            for conn in self.idle + list(self.in_use):
+                conn.close()
+            self.idle.clear()
+            self.in_use.clear()
+
+
+def get_connection_pool(host, port, database, user, password):
+    """
+    Returns the pool of the given server/database/user, creating it on first use.
+    Connections are opened lazily; a changed password replaces the pool.
+    """
+    key = (host, str(port), database, user)
+    entry = connection_pools.get(key)
+    if entry and entry["password"] != password:
+        entry["pool"].closeall()
+        entry = None
+    if entry is None:
+        pool = LazyConnectionPool(
+            POOL_MAX_CONNECTIONS,
+            host=host,
+            port=port,
+            database=database,
+            user=user,
+            password=password,
+            gssencmode='disable',
+            sslmode='prefer'
+        )
+        entry = connection_pools[key] = {"pool": pool, "password": password}
+    entry["last_used"] = time.monotonic()
+    return entry["pool"]
+
+
+def get_healthy_connection(pool):
+    """
+    Checks out a connection that answers 'SELECT 1'. Connections that were dropped while idle
+    (server restart, firewall timeout) are discarded and replaced by a fresh one.
+    """
+    for _ in range(POOL_MAX_CONNECTIONS + 1):
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()  # Hand the connection out with no transaction open
+            return conn
+        except psycopg2.Error:
+            pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("No healthy connection available in the pool.")
+
+
+def release_connection(pool, conn):
+    """Ends any open transaction and returns the connection to its pool (closing it if it is broken)."""
+    try:
+        conn.rollback()
+        broken = False
+    except psycopg2.Error:
+        broken = True
+    pool.putconn(conn, close=broken or bool(conn.closed))
+
+
+def close_idle_pools(max_idle_seconds=POOL_IDLE_TIMEOUT_SECONDS):
+    """Closes every pool that has not been used for max_idle_seconds."""
+    now = time.monotonic()
+    for key, entry in list(connection_pools.items()):
+        if now - entry["last_used"] >= max_idle_seconds:
+            entry["pool"].closeall()
+            del connection_pools[key]
+
+
+def sweep_idle_pools():
+    """Periodic GUI task: closes idle pools, then reschedules itself."""
+    close_idle_pools()
+    root.after(POOL_SWEEP_INTERVAL_MS, sweep_idle_pools)
+
+
+def on_close():
+    """Closes all pooled connections before the window is destroyed."""
+    close_idle_pools(0)
+    root.destroy()
+
+
+# --- Backup Export (parallel, on one shared snapshot) ---
+
+def begin_snapshot_transaction(conn, snapshot_id=None):
+    """Starts a read-only REPEATABLE READ transaction, on an exported snapshot when one is given."""
+    with conn.cursor() as cursor:
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        if snapshot_id:
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot_id,))
+
+
+def export_snapshot(conn):
+    """
+    Opens the coordinating transaction and returns its pg_export_snapshot() id, or None when the
+    server cannot export snapshots (the transaction is then restarted for a sequential export).
+    """
+    begin_snapshot_transaction(conn)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_export_snapshot()")
+            return cursor.fetchone()[0]
+    except psycopg2.Error:
+        conn.rollback()
+        begin_snapshot_transaction(conn)
+        return None
+
+
+def get_table_writer(backup_format, rows_per_statement=INSERT_ROWS_PER_STATEMENT,
+                     commit_every=INSERT_COMMIT_EVERY_STATEMENTS):
+    """
+    Returns the function that writes one table in the given backup format:
+    writer(conn, out, table_name, condition, order_by, id_list).
+    """
+    if backup_format == "COPY":
+        return write_table_copy
+    return functools.partial(write_table_inserts, rows_per_statement=rows_per_statement, commit_every=commit_every)
+
+
+def export_table_part(pool, snapshot_id, export, id_list, part_file, write_table):
+    """Worker thread: exports one table into its part file on its own pooled connection and the shared snapshot."""
+    conn = get_healthy_connection(pool)
+    try:
+        begin_snapshot_transaction(conn, snapshot_id)
+        with open(part_file, "w", encoding="utf-8", newline="") as out:
+            write_table(conn, out, *export, id_list)
+    finally:
+        release_connection(pool, conn)
+
+
+def export_parts_parallel(pool, snapshot_id, id_list, plan, part_files, write_table):
+    """Exports every table concurrently. Returns (table name, error) of the first failure, or None."""
+    workers = max(1, min(len(plan), POOL_MAX_CONNECTIONS - 1))  # The coordinator holds one connection
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(export_table_part, pool, snapshot_id, export, id_list, part, write_table)
+                   for export, part in zip(plan, part_files)]
+        for (table_name, _, _), future in zip(plan, futures):
+            try:
+                future.result()
+            except (Exception, psycopg2.DatabaseError) as error:
+                return table_name, error
+    return None
+
+
+def export_parts_sequential(conn, id_list, plan, part_files, write_table):
+    """Exports the tables one by one in conn's transaction. Returns (table name, error) of a failure, or None."""
+    for export, part_file in zip(plan, part_files):
+        try:
+            with open(part_file, "w", encoding="utf-8", newline="") as out:
+                write_table(conn, out, *export, id_list)
+        except (Exception, psycopg2.DatabaseError) as error:
+            return export[0], error
+    return None
+
+
+def write_backup_script(pool, conn, backup_file, id_list, plan, write_table=write_table_inserts):
+    """
+    Writes the backup script of the export plan (see build_export_plan) to backup_file, in plan order;
+    write_table (see get_table_writer) writes one table in the chosen format.
+
+    conn (from pool) coordinates: it exports its snapshot, and every table is exported concurrently on
+    another pooled connection that imports it, so the backup is consistent and takes about as long as
+    the slowest table. Each table goes to a temporary part file; the parts are then concatenated in
+    table order. Without snapshot export support (or if the parallel export fails), the tables are
+    exported sequentially in conn's own REPEATABLE READ transaction.
+
+    Returns True on success; on failure the error is shown and False is returned.
+    """
+    part_files = [f"{backup_file}.part{i}" for i in range(len(plan))]
+    try:
+        snapshot_id = export_snapshot(conn)
+        failure = None
+        if snapshot_id and len(plan) > 1:
+            failure = export_parts_parallel(pool, snapshot_id, id_list, plan, part_files, write_table)
+        if failure or not snapshot_id or len(plan) <= 1:
+            failure = export_parts_sequential(conn, id_list, plan, part_files, write_table)
+        if failure:
+            table_name, error = failure
+            messagebox.showerror(f"Database Error ({table_name})", f"Error: {error}")
+            return False
+
+        # No newline translation anywhere: CR/CRLF inside string values must reach the backup unchanged
+        with open(backup_file, "w", encoding="utf-8", newline="") as out:
+            out.write(f"-- Backup script for {len(id_list)} function ID(s)\n\n")
+            for i, part_file in enumerate(part_files):
+                if i:
+                    out.write("\n")
+                with open(part_file, "r", encoding="utf-8", newline="") as part:
+                    shutil.copyfileobj(part, out)
+        return True
+    finally:
+        for part_file in part_files:
+            if os.path.exists(part_file):
+                os.remove(part_file)
 
 
 # --- Main Application Logic ---
@@ -79,6 +566,7 @@ def generate_scripts():
     db_user = entry_user.get()
     db_pass = entry_pass.get()
     id_text = text_ids.get("1.0", "end-1c")
+    backup_format = combo_format.get()
 
     # 2. Validate inputs
     if not all([db_host, db_port, db_name, db_user, db_pass, id_text]):
@@ -86,6 +574,15 @@ def generate_scripts():
                                "Please fill in all database fields and provide at least one Function ID.")
         return
 
+    try:
+        rows_per_statement = int(entry_rows_per_statement.get() or 0)
+        commit_every = int(entry_commit_every.get() or 0)
+        if rows_per_statement < 0 or commit_every < 0:
+            raise ValueError
+    except ValueError:
+        messagebox.showwarning("Input Error", "Rows per INSERT and COMMIT every must be whole numbers (0 = off).")
+        return
+
     # 3. Process the function IDs
     # Split by lines, strip whitespace, and filter out empty lines
     func_ids = [fid.strip().upper() for fid in id_text.splitlines() if fid.strip()]
@@ -94,58 +591,10 @@ def generate_scripts():
         messagebox.showwarning("Input Error", "No valid Function IDs entered.")
         return
 
-    # Format for SQL 'IN' clause (e.g., 'ID1', 'ID2')
-    formatted_id_list = ', '.join([f"'{fid}'" for fid in func_ids])
-
-    # 4. Generate the DELETE script (this can be done without a DB connection)
-    delete_script = f"""-- Delete data from func
-DELETE FROM func WHERE func_id IN ({formatted_id_list});
-
--- Delete data from func_role_priv
-DELETE FROM func_role_priv WHERE func_id IN ({formatted_id_list});
-"""
+    # Format for the DELETE script's ARRAY[...] (e.g., 'ID1', 'ID2')
+    formatted_id_list = ', '.join([format_sql_string(fid) for fid in func_ids])
 
-    # 5. Generate the BACKUP script (requires DB connection)
-    backup_script_parts = [f"-- Backup script for {len(func_ids)} function ID(s)\n\n"]
-    conn = None
-    try:
-        # Connect to the database
-        # This call correctly takes the values from the GUI fields
-        conn = psycopg2.connect(
-            host=db_host,
-            port=db_port,
-            database=db_name,
-            user=db_user,
-            password=db_pass,
-            gssencmode = 'disable',
-            sslmode='prefer'
-        )
-        cursor = conn.cursor()
-
-        # Fetch and format data for 'func' table
-        func_inserts = fetch_and_format_inserts(cursor, 'func', func_ids)
-        if func_inserts is None: return  # Error was already shown
-        backup_script_parts.append(func_inserts)
-        backup_script_parts.append("\n")
-
-        # Fetch and format data for 'func_role_priv' table
-        frp_inserts = fetch_and_format_inserts(cursor, 'func_role_priv', func_ids)
-        if frp_inserts is None: return  # Error was already shown
-        backup_script_parts.append(frp_inserts)
-
-        # Close connection
-        cursor.close()
-
-    except (Exception, psycopg2.DatabaseError) as error:
-        messagebox.showerror("Connection Error", f"Could not connect to database.\nError: {error}")
-        return
-    finally:
-        if conn:
-            conn.close()
-
-    backup_script = "".join(backup_script_parts)
-
-    # 6. Prompt user to save the files
+    # 4. Prompt user to save the files (first, so the backup can be streamed straight to disk)
     file_path = filedialog.asksaveasfilename(
         title="Save SQL Scripts As...",
         defaultextension=".sql",
@@ -166,19 +615,45 @@ DELETE FROM func_role_priv WHERE func_id IN ({formatted_id_list});
     delete_file = f"{base_name}_delete.sql"
     backup_file = f"{base_name}_backup.sql"
 
+    # 5. Generate the BACKUP script (requires DB connection), streamed into the backup file
+    try:
+        # Reuse a pooled connection (only the first export to a database pays for the connection setup)
+        # This call correctly takes the values from the GUI fields
+        pool = get_connection_pool(db_host, db_port, db_name, db_user, db_pass)
+        conn = get_healthy_connection(pool)
+    except (Exception, psycopg2.DatabaseError) as error:
+        messagebox.showerror("Connection Error", f"Could not connect to database.\nError: {error}")
+        return
+
     try:
+        # Configured tables plus their foreign key dependents, parents first
+        try:
+            plan = build_export_plan(get_foreign_keys(conn))
+        except psycopg2.Error as error:
+            messagebox.showerror("Database Error", f"Could not read the foreign keys.\nError: {error}")
+            return
+
+        write_table = get_table_writer(backup_format, rows_per_statement, commit_every)
+        if not write_backup_script(pool, conn, backup_file, func_ids, plan, write_table=write_table):
+            return  # Error was already shown
+
+        # 6. Generate the DELETE script, children first
+        id_array = f"ARRAY[{formatted_id_list}]"
+        delete_script = "\n".join(
+            f"-- Delete data from {table_name}\n"
+            f"DELETE FROM {table_name} WHERE {render_condition(condition, id_array)};\n"
+            for table_name, condition, _ in reversed(plan))
+
         # Write the DELETE script
         with open(delete_file, "w", encoding="utf-8") as f:
             f.write(delete_script)
 
-        # Write the BACKUP script
-        with open(backup_file, "w", encoding="utf-8") as f:
-            f.write(backup_script)
-
         messagebox.showinfo("Success!", f"Scripts generated successfully:\n\n1. {delete_file}\n2. {backup_file}")
 
     except Exception as e:
         messagebox.showerror("File Error", f"Could not write files.\nError: {e}")
+    finally:
+        release_connection(pool, conn)
 
 
 # --- GUI Setup ---
@@ -228,13 +703,38 @@ ttk.Label(id_frame, text="Enter Function IDs (one per line):").grid(row=0, colum
 text_ids = scrolledtext.ScrolledText(id_frame, width=60, height=10, wrap=tk.WORD)
 text_ids.grid(row=1, column=0, pady=5)
 
+# --- Backup Format Frame ---
+format_frame = ttk.LabelFrame(frame, text="Backup Format", padding="10")
+format_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+
+ttk.Label(format_frame, text="Format:").grid(row=0, column=0, sticky=tk.W, padx=5)
+combo_format = ttk.Combobox(format_frame, values=BACKUP_FORMATS, state="readonly", width=10)
+combo_format.set(BACKUP_FORMATS[0])
+combo_format.grid(row=0, column=1, sticky=tk.W, padx=5)
+ttk.Label(format_frame, text="COPY is much faster, but the backup must be restored with psql/gsql.").grid(
+    row=0, column=2, columnspan=3, sticky=tk.W, padx=5)
+
+# INSERT format options
+ttk.Label(format_frame, text="Rows per INSERT:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
+entry_rows_per_statement = ttk.Entry(format_frame, width=10)
+entry_rows_per_statement.insert(0, str(INSERT_ROWS_PER_STATEMENT))
+entry_rows_per_statement.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+ttk.Label(format_frame, text="COMMIT every N INSERTs (0 = off):").grid(row=1, column=2, sticky=tk.W, padx=5)
+entry_commit_every = ttk.Entry(format_frame, width=10)
+entry_commit_every.insert(0, str(INSERT_COMMIT_EVERY_STATEMENTS))
+entry_commit_every.grid(row=1, column=3, sticky=tk.W, padx=5)
+
 # --- Generate Button ---
 generate_button = ttk.Button(frame, text="Generate SQL Scripts", command=generate_scripts)
-generate_button.grid(row=2, column=0, columnspan=2, pady=10)
+generate_button.grid(row=3, column=0, columnspan=2, pady=10)
 
 # Configure resizing
 root.columnconfigure(0, weight=1)
 root.rowconfigure(0, weight=1)
 frame.columnconfigure(0, weight=1)
 
+# Close idle pooled connections periodically, and all of them on exit
+root.after(POOL_SWEEP_INTERVAL_MS, sweep_idle_pools)
+root.protocol("WM_DELETE_WINDOW", on_close)
+
 root.mainloop()
\ No newline at end of file
@@ -1,5 +1,14 @@
 import xml.etree.ElementTree as ET
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import time
 import pandas as pd
+import yaml
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from openpyxl import load_workbook
 
 # -------------------- CONFIG --------------------
 MENU_XML_FILE = r"C:\Users\admin\Workspace\pj-hkpf-pics3-revamp2-boot-up-application-with-ant-gaussdb\picsII_web\JavaSource\menu.xml"
@@ -15,14 +24,25 @@ KEY_FILTER = "PIMS"  # Only touch keys containing this. Set to "ALL" for no filt
 EXCEL_KEY_COL = "Key"
 EXCEL_ZH_COL = "zh_TW_value"
 
+# Locale properties files to update in one run, each with the Excel column holding its values.
+# menu.xml, the EN renames and the workbook are processed once and shared by all locales.
+LOCALES = [
+    (ZH_PROPERTIES_FILE, EXCEL_ZH_COL),
+    # (r"...\menu_zh_CN.properties", "zh_CN_value"),
+]
+
+# Parsed workbook columns are cached next to the workbook, keyed by its mtime/size and SHA-1
+EXCEL_CACHE_SUFFIX = ".cache.json"
+EXCEL_CACHE_VERSION = 2
+
 
 # ------------------------------------------------
 
 
-def key_matches_filter(key: str) -> bool:
-    if KEY_FILTER.upper() == "ALL":
+def key_matches_filter(key: str, key_filter=KEY_FILTER) -> bool:
+    if key_filter.upper() == "ALL":
         return True
-    return KEY_FILTER in key
+    return key_filter in key
 
 
 def is_menu_tag(elem):
@@ -34,39 +54,52 @@ def parse_menu_labels(menu_xml_file, root_menu_id=ROOT_MENU_ID):
     """
     Build {label -> id} for all <menu ...> INSIDE <menu id=root_menu_id>.
     Namespace-agnostic.
-    """
-    tree = ET.parse(menu_xml_file)
-    root = tree.getroot()
 
-    # Find <menu id="PIMS">
-    menu_block = None
-    for node in root.iter():
-        if is_menu_tag(node) and node.attrib.get("id") == root_menu_id:
-            menu_block = node
-            break
+    Streams the file with iterparse: finished elements are detached and cleared as they close,
+    and parsing stops as soon as the root menu block closes.
+    """
+    label_to_id = {}
+    seen = []  # menu ids passed before the root block (for the error message)
+    open_elems = []  # currently open elements, outermost first
+    # While inside the root block: one flag per open element below it, True if it is reachable
+    # from the root through <menu> tags only (same rule as walking menu children recursively)
+    in_menu_chain = []
+    found = False
+
+    for event, elem in ET.iterparse(menu_xml_file, events=("start", "end")):
+        if event == "start":
+            open_elems.append(elem)
+            if in_menu_chain:
+                reachable = in_menu_chain[-1] and is_menu_tag(elem)
+                in_menu_chain.append(reachable)
+                if reachable:
+                    mid = elem.attrib.get("id")
+                    lbl = elem.attrib.get("label")
+                    if mid and lbl:
+                        label_to_id[lbl.strip()] = mid.strip()
+            elif is_menu_tag(elem) and "id" in elem.attrib:
+                if elem.attrib["id"] == root_menu_id:
+                    # Skip the root node's own label; only its children are collected
+                    found = True
+                    in_menu_chain.append(True)
+                else:
+                    seen.append(elem.attrib["id"])
+            continue
 
-    if menu_block is None:
-        seen = [n.attrib.get("id") for n in root.iter() if is_menu_tag(n) and "id" in n.attrib]
+        # event == "end"
+        open_elems.pop()
+        if in_menu_chain:
+            in_menu_chain.pop()
+            if not in_menu_chain:
+                break  # root menu block closed, nothing left to collect
+        elem.clear()
+        if open_elems:
+            open_elems[-1].remove(elem)
+
+    if not found:
         raise ValueError(
             f"No menu block with id={root_menu_id} found. Seen ids: {', '.join([s for s in seen if s]) or '(none)'}")
 
-    label_to_id = {}
-
-    def recurse(n):
-        if is_menu_tag(n):
-            mid = n.attrib.get("id")
-            lbl = n.attrib.get("label")
-            if mid and lbl:
-                label_to_id[lbl.strip()] = mid.strip()
-            for c in list(n):
-                if is_menu_tag(c):
-                    recurse(c)
-
-    # Only traverse inside the PIMS block’s children (skip the root node’s own label)
-    for child in list(menu_block):
-        if is_menu_tag(child):
-            recurse(child)
-
     if not label_to_id:
         raise ValueError(f"Menu block id={root_menu_id} found but contains no labeled child <menu> nodes.")
     return label_to_id
@@ -82,79 +115,210 @@ def write_properties_lines(path, lines):
         f.writelines(lines)
 
 
-def rename_keys_by_labels_in_en(path, label_to_id):
+def parse_properties_lines(lines):
     """
-    Scan EN properties; when a line's value equals a known label AND key matches filter,
-    rename key -> corresponding menu id. Record old_key -> new_key mapping (for use on ZH).
-    Preserve order and untouched lines.
+    Ordered line model of a properties file: one [text, key, value] per line.
+    key/value are None for comments, blank lines and lines without '='.
+    value keeps the RHS spacing of the stripped line.
     """
-    lines = read_properties_lines(path)
-    new_lines = []
-    old_to_new = {}
-
+    model = []
     for line in lines:
         stripped = line.strip()
         if "=" in stripped and not stripped.startswith("#"):
             key, value = stripped.split("=", 1)
-            raw_value = value  # keep RHS spacing
-            key = key.strip()
-            val_clean = value.strip()
-            if key_matches_filter(key) and val_clean in label_to_id:
-                new_key = label_to_id[val_clean]
-                old_to_new[key] = new_key
-                new_lines.append(f"{new_key}={raw_value}\n")
-            else:
-                new_lines.append(line)
+            model.append([line, key.strip(), value])
         else:
-            new_lines.append(line)
+            model.append([line, None, None])
+    return model
+
+
+def load_properties_model(path):
+    """Read a properties file once. Returns (original lines, line model)."""
+    lines = read_properties_lines(path)
+    return lines, parse_properties_lines(lines)
+
+
+def new_change_set(path):
+    """
+    Changes planned for one properties file by the rewrite functions:
+    lines touched (1-based line numbers), keys renamed (old -> new) and values changed (key -> (old, new)).
+    """
+    return {"path": path, "lines_touched": set(), "keys_renamed": {}, "values_changed": {}, "diff": ""}
+
+
+def describe_change_set(change_set):
+    return (f"{change_set['path']}: {len(change_set['lines_touched'])} line(s) touched, "
+            f"{len(change_set['keys_renamed'])} key(s) renamed, {len(change_set['values_changed'])} value(s) changed")
 
+
+def save_properties_model(path, original_lines, model, change_set, dry_run=False):
+    """
+    Write the model back to path only if the change set is non-empty.
+    With dry_run, nothing is written and the unified diff is stored in change_set["diff"] instead.
+    Returns True if the file was written.
+    """
+    if not change_set["lines_touched"]:
+        return False
+
+    new_lines = [entry[0] for entry in model]
+    if dry_run:
+        change_set["diff"] = "".join(difflib.unified_diff(original_lines, new_lines, fromfile=path, tofile=path))
+        return False
     write_properties_lines(path, new_lines)
+    return True
+
+
+def rename_keys_by_labels_in_en(en_model, label_to_id, change_set, key_filter=KEY_FILTER):
+    """
+    Scan EN properties; when a line's value equals a known label AND key matches filter,
+    rename key -> corresponding menu id. Record old_key -> new_key mapping (for use on ZH).
+    Preserve order and untouched lines. Works on the line model in place; lines whose key
+    already is the menu id are left alone.
+    """
+    old_to_new = {}
+
+    for line_no, entry in enumerate(en_model, start=1):
+        _, key, value = entry
+        if key is None:
+            continue
+        val_clean = value.strip()
+        if key_matches_filter(key, key_filter) and val_clean in label_to_id:
+            new_key = label_to_id[val_clean]
+            old_to_new[key] = new_key
+            if new_key != key:
+                entry[0] = f"{new_key}={value}\n"  # keep RHS spacing
+                entry[1] = new_key
+                change_set["lines_touched"].add(line_no)
+                change_set["keys_renamed"][key] = new_key
+
     return old_to_new
 
 
-def rename_keys_using_map(path, old_to_new):
+def rename_keys_using_map(model, old_to_new, change_set, key_filter=KEY_FILTER):
     """
-    Apply the same key renames to another properties file (e.g., ZH),
+    Apply the same key renames to another properties model (e.g., ZH),
     regardless of the value (works even if values are Chinese).
     Only rename if original key matches filter.
     """
     if not old_to_new:
         return
 
-    lines = read_properties_lines(path)
-    new_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if "=" in stripped and not stripped.startswith("#"):
-            key, value = stripped.split("=", 1)
-            key_clean = key.strip()
-            if key_matches_filter(key_clean) and key_clean in old_to_new:
-                new_key = old_to_new[key_clean]
-                new_lines.append(f"{new_key}={value}\n")
-            else:
-                new_lines.append(line)
-        else:
-            new_lines.append(line)
+    for line_no, entry in enumerate(model, start=1):
+        _, key, value = entry
+        if key is not None and key_matches_filter(key, key_filter) and key in old_to_new:
+            new_key = old_to_new[key]
+            if new_key == key:
+                continue
+            entry[0] = f"{new_key}={value}\n"
+            entry[1] = new_key
+            change_set["lines_touched"].add(line_no)
+            change_set["keys_renamed"][key] = new_key
 
-    write_properties_lines(path, new_lines)
+
+def file_sha1(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
 
 
-def load_excel_translations(excel_path):
+def excel_cells_to_str(cells):
     """
-    Return dict of {excel_key -> zh_value} filtered by KEY_FILTER.
+    Stringify one column the way pd.read_excel(...).astype(str) does: pandas infers the column dtype
+    (ints next to empty cells become "1.0", dates "2024-01-02 00:00:00") and empty cells become "nan".
     """
-    df = pd.read_excel(excel_path)
-    df[EXCEL_KEY_COL] = df[EXCEL_KEY_COL].astype(str).str.strip()
-    df[EXCEL_ZH_COL] = df[EXCEL_ZH_COL].astype(str).str.strip()
-    if KEY_FILTER.upper() != "ALL":
-        df = df[df[EXCEL_KEY_COL].apply(key_matches_filter)]
-    return dict(zip(df[EXCEL_KEY_COL], df[EXCEL_ZH_COL]))
+    return ["nan" if pd.isna(v) else str(v) for v in pd.Series(cells)]
 
 
-def update_zh_values_from_excel(zh_path, excel_map, old_to_new):
+def read_excel_columns(excel_path, columns):
     """
-    Update zh_TW.properties values from Excel.
-    - Only touch lines whose key matches the filter.
+    Stream the first sheet in read-only mode and return {column -> list of str} for the given header names.
+    Other columns are skipped. Rows are kept like pd.read_excel keeps them: blank rows inside the data stay
+    (as "nan"), trailing blank rows are dropped.
+    """
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise ValueError(f"Column(s) {', '.join(missing)} not found in {excel_path}. Found: {', '.join(header)}")
+        indexes = [header.index(c) for c in columns]
+
+        cells = {c: [] for c in columns}
+        data_rows = 0
+        for row in rows:
+            for c, i in zip(columns, indexes):
+                cell = row[i] if i < len(row) else None
+                if isinstance(cell, float) and cell.is_integer():
+                    cell = int(cell)  # pandas' openpyxl reader does the same
+                cells[c].append(cell)
+            if any(cell is not None for cell in row):
+                data_rows = len(cells[columns[0]])
+        return {c: excel_cells_to_str(cells[c][:data_rows]) for c in columns}
+    finally:
+        wb.close()
+
+
+def load_excel_columns(excel_path, columns, dry_run=False):
+    """
+    read_excel_columns() with a JSON side cache (<workbook>.cache.json).
+    An unchanged mtime/size, or else an unchanged SHA-1, reuses the cache and skips openpyxl entirely.
+    With dry_run an existing cache is still used, but it is never created or rewritten.
+    """
+    columns = list(columns)
+    cache_path = excel_path + EXCEL_CACHE_SUFFIX
+    stat = os.stat(excel_path)
+
+    cache = None
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") != EXCEL_CACHE_VERSION or cache.get("columns") != columns:
+            cache = None
+    except (OSError, ValueError, AttributeError):
+        cache = None
+
+    if cache and cache["mtime_ns"] == stat.st_mtime_ns and cache["size"] == stat.st_size:
+        return cache["data"]
+
+    sha1 = file_sha1(excel_path)
+    if cache and cache["sha1"] == sha1:
+        data = cache["data"]  # touched but not modified
+    else:
+        data = read_excel_columns(excel_path, columns)
+
+    if dry_run:
+        return data
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({"version": EXCEL_CACHE_VERSION, "columns": columns, "mtime_ns": stat.st_mtime_ns,
+                       "size": stat.st_size, "sha1": sha1, "data": data}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"Could not write Excel cache {cache_path}: {e}")
+    return data
+
+
+def load_excel_translations(excel_path, value_cols=(EXCEL_ZH_COL,), key_filter=KEY_FILTER, dry_run=False):
+    """
+    Return {value_col -> {excel_key -> value}} filtered by key_filter.
+    Only the key column and the requested value columns are read, in one pass over the workbook.
+    """
+    value_cols = list(value_cols)
+    data = load_excel_columns(excel_path, [EXCEL_KEY_COL] + value_cols, dry_run)
+    df = pd.DataFrame(data, dtype=str)
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+    if key_filter.upper() != "ALL":
+        df = df[df[EXCEL_KEY_COL].str.contains(key_filter, regex=False)]
+    return {col: dict(zip(df[EXCEL_KEY_COL], df[col])) for col in value_cols}
+
+
+def update_zh_values_from_excel(zh_model, excel_map, old_to_new, change_set, key_filter=KEY_FILTER):
+    """
+    Update zh_TW.properties values from Excel, on the line model in place.
+    - Only touch lines whose key matches the filter and whose value differs.
     - Support both old keys and their renamed new keys (via old_to_new).
     """
     # Build a unified lookup: any new_key gets value from its original Excel old_key
@@ -163,91 +327,326 @@ def update_zh_values_from_excel(zh_path, excel_map, old_to_new):
         if old_key in excel_map:
             excel_lookup[new_key] = excel_map[old_key]
 
-    lines = read_properties_lines(zh_path)
-    new_lines = []
-
-    for line in lines:
-        stripped = line.strip()
-        if "=" in stripped and not stripped.startswith("#"):
-            key, value = stripped.split("=", 1)
-            key_clean = key.strip()
-            if key_matches_filter(key_clean) and key_clean in excel_lookup:
-                # Replace ONLY the value, keep key as-is
-                new_val = excel_lookup[key_clean]
-                new_lines.append(f"{key_clean}={new_val}\n")
-            else:
-                new_lines.append(line)
-        else:
-            new_lines.append(line)
-
-    write_properties_lines(zh_path, new_lines)
+    for line_no, entry in enumerate(zh_model, start=1):
+        _, key, value = entry
+        if key is not None and key_matches_filter(key, key_filter) and key in excel_lookup:
+            # Replace ONLY the value, keep key as-is
+            new_val = excel_lookup[key]
+            if new_val == value.strip():
+                continue
+            entry[0] = f"{key}={new_val}\n"
+            entry[2] = new_val
+            change_set["lines_touched"].add(line_no)
+            change_set["values_changed"][key] = (value.strip(), new_val)
 
 
-def collect_properties_keys(path):
-    keys = []
-    lines = read_properties_lines(path)
-    for line in lines:
-        stripped = line.strip()
-        if "=" in stripped and not stripped.startswith("#"):
-            key = stripped.split("=", 1)[0].strip()
-            if key_matches_filter(key):
-                keys.append(key)
-    return set(keys)
+def collect_properties_keys(model, key_filter=KEY_FILTER):
+    return {key for _, key, _ in model if key is not None and key_matches_filter(key, key_filter)}
 
 
-def write_missing_report(excel_map, props_keys_after, old_to_new):
+def build_missing_report(excel_map, props_keys_after, old_to_new):
     """
-    Create missing_translations_menu.xlsx (filtered by KEY_FILTER).
+    Missing keys of one locale as a DataFrame with columns Key, Location.
+    excel_map and props_keys_after are expected to be filtered by the key filter already.
     - Excel-only: Excel key (or its mapped new key) not in properties.
     - Properties-only: Property key not represented by any Excel key (considering renames).
+    Both come from a single outer merge of the Excel-side keys with the properties keys.
     """
-    # Excel keys (old)
-    excel_keys = set(excel_map.keys())
-
-    # Map Excel old->new when possible for presence check
-    mapped_excel_presence = set()
-    for k in excel_keys:
-        mapped_excel_presence.add(old_to_new.get(k, k))
-
-    in_excel_not_in_props = sorted(k for k in excel_keys if old_to_new.get(k, k) not in props_keys_after)
+    # Excel keys (old) with their mapped new key when renamed
+    excel_df = pd.DataFrame({"ExcelKey": pd.Series(list(excel_map), dtype=str)})
+    renames_df = pd.DataFrame({"ExcelKey": pd.Series(list(old_to_new.keys()), dtype=str),
+                               "NewKey": pd.Series(list(old_to_new.values()), dtype=str)})
+    excel_df = excel_df.merge(renames_df, on="ExcelKey", how="left")
+    mapped_keys = excel_df["NewKey"].fillna(excel_df["ExcelKey"])
+
+    # Keys covered by Excel: the mapped key of every Excel key (checked for presence) and the old key itself
+    excel_side = pd.concat([
+        pd.DataFrame({"Key": mapped_keys, "ExcelKey": excel_df["ExcelKey"], "Mapped": True}),
+        pd.DataFrame({"Key": excel_df["ExcelKey"], "ExcelKey": excel_df["ExcelKey"], "Mapped": False}),
+    ], ignore_index=True).drop_duplicates()
+    props_df = pd.DataFrame({"Key": pd.Series(sorted(props_keys_after), dtype=str)})
+
+    merged = excel_side.merge(props_df, on="Key", how="outer", indicator=True)
+    left_only = merged["_merge"] == "left_only"
+    in_excel_not_in_props = merged.loc[left_only & merged["Mapped"].eq(True), "ExcelKey"]
+    in_props_not_in_excel = merged.loc[merged["_merge"] == "right_only", "Key"]
+
+    df = pd.concat([
+        pd.DataFrame({"Key": in_excel_not_in_props.drop_duplicates().sort_values(), "Location": "Excel only"}),
+        pd.DataFrame({"Key": in_props_not_in_excel.drop_duplicates().sort_values(), "Location": "Properties only"}),
+    ], ignore_index=True)
+
+    return df
+
+
+def write_missing_report(reports):
+    """
+    Create missing_translations_menu.xlsx with one sheet per locale that has missing keys.
+    reports: {sheet name -> DataFrame from build_missing_report}
+    """
+    reports = {name: df for name, df in reports.items() if not df.empty}
+    if not reports:
+        return
 
-    # For props-only, any prop key that is not equal to any Excel key or mapped Excel new key
-    props_only = []
-    for pk in props_keys_after:
-        # if pk equals an Excel old key OR equals a mapped new key, it's covered by Excel
-        if pk in excel_keys or pk in mapped_excel_presence:
-            continue
-        props_only.append(pk)
-    in_props_not_in_excel = sorted(props_only)
+    with pd.ExcelWriter(OUTPUT_MISSING_FILE) as writer:
+        for sheet_name, df in reports.items():
+            df.to_excel(writer, sheet_name=sheet_name[:31], index=False)  # Excel limits sheet names to 31 chars
 
-    rows = []
-    for k in in_excel_not_in_props:
-        rows.append([k, "Excel only"])
-    for k in in_props_not_in_excel:
-        rows.append([k, "Properties only"])
 
-    if rows:
-        df = pd.DataFrame(rows, columns=["Key", "Location"])
-        df.to_excel(OUTPUT_MISSING_FILE, index=False)
+def update_locale_file(locale_path, excel_map, old_to_new, key_filter=KEY_FILTER, dry_run=False):
+    """
+    Apply the EN key renames and the Excel values to one locale file (read once, written only if changed).
+    Returns (filtered keys of the updated file, change set).
+    """
+    lines, model = load_properties_model(locale_path)
+    change_set = new_change_set(locale_path)
+    rename_keys_using_map(model, old_to_new, change_set, key_filter)
+    update_zh_values_from_excel(model, excel_map, old_to_new, change_set, key_filter)
+    save_properties_model(locale_path, lines, model, change_set, dry_run)
+    return collect_properties_keys(model, key_filter), change_set
 
 
-if __name__ == "__main__":
+def run_pipeline(menu_xml_file, en_path, locales, excel_path, root_menu_id=ROOT_MENU_ID, key_filter=KEY_FILTER,
+                 excel_translations=None, dry_run=False):
+    """
+    Rename keys and update locale values.
+    locales: list of (locale properties path, Excel value column).
+    excel_translations: optional {value_col -> {excel_key -> value}} already loaded from excel_path
+        (unfiltered or filtered); the workbook is only read when it is not given.
+
+    menu.xml, EN and the workbook are processed once and shared by all locales; the locale
+    files are then rewritten concurrently. Every file is read once and written at most once
+    (only if its change set is non-empty). With dry_run no file is written.
+
+    Returns:
+        tuple: ({locale file name -> missing keys DataFrame} (see build_missing_report),
+                [change set per properties file, EN first])
+    """
     # 1) Parse menu.xml: label -> id
-    label_to_id = parse_menu_labels(MENU_XML_FILE, root_menu_id=ROOT_MENU_ID)
+    label_to_id = parse_menu_labels(menu_xml_file, root_menu_id=root_menu_id)
 
     # 2) Rename keys in EN by label matching, record old->new
-    old_to_new_map = rename_keys_by_labels_in_en(EN_PROPERTIES_FILE, label_to_id)
+    en_lines, en_model = load_properties_model(en_path)
+    en_change_set = new_change_set(en_path)
+    old_to_new_map = rename_keys_by_labels_in_en(en_model, label_to_id, en_change_set, key_filter)
+    save_properties_model(en_path, en_lines, en_model, en_change_set, dry_run)
+    en_keys = collect_properties_keys(en_model, key_filter)
+
+    # 3) Load Excel translations for every locale column at once
+    value_cols = [value_col for _, value_col in locales]
+    if excel_translations is None:
+        excel_translations = load_excel_translations(excel_path, value_cols, key_filter, dry_run)
+    else:
+        excel_translations = {
+            col: {k: v for k, v in excel_translations[col].items() if key_matches_filter(k, key_filter)}
+            for col in value_cols
+        }
+
+    # 4) Apply the same key renames (value-agnostic) and Excel values to each locale (support old & new keys)
+    with ThreadPoolExecutor(max_workers=max(1, len(locales))) as executor:
+        futures = [
+            executor.submit(update_locale_file, locale_path, excel_translations[value_col], old_to_new_map,
+                            key_filter, dry_run)
+            for locale_path, value_col in locales
+        ]
+        locale_results = [future.result() for future in futures]
+
+    # 5) Missing keys report per locale (filtered, and rename-aware)
+    reports = {}
+    for (locale_path, value_col), (keys, _) in zip(locales, locale_results):
+        sheet_name = os.path.splitext(os.path.basename(locale_path))[0]
+        reports[sheet_name] = build_missing_report(excel_translations[value_col], keys | en_keys, old_to_new_map)
+    return reports, [en_change_set] + [change_set for _, change_set in locale_results]
+
+
+def print_change_sets(change_sets, dry_run=False):
+    for change_set in change_sets:
+        print(("[dry-run] " if dry_run else "") + describe_change_set(change_set))
+        if change_set["diff"]:
+            print(change_set["diff"], end="")
+
+
+# -------------------- BATCH JOBS --------------------
+
+def load_job_manifest(manifest_path):
+    """
+    Read a YAML job manifest:
+
+        jobs:
+          - name: picsII_web
+            menu_xml: C:/.../picsII_web/JavaSource/menu.xml
+            en_properties: C:/.../picsII_web/JavaSource/menu.properties
+            # or "locales: [{properties: ..., excel_column: zh_CN_value}, ...]"
+            zh_properties: C:/.../picsII_web/JavaSource/menu_zh_TW.properties
+            excel: translations.xlsx
+            root_menu_id: PIMS      # optional, default ROOT_MENU_ID
+            key_filter: PIMS        # optional, default KEY_FILTER
+
+    Returns:
+        list of dict: Jobs with every field filled in; locales as a list of (path, Excel column).
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = yaml.safe_load(f) or {}
+
+    jobs = []
+    for i, raw in enumerate(manifest.get("jobs", []), start=1):
+        if "locales" in raw:
+            locales = [(loc["properties"], loc.get("excel_column", EXCEL_ZH_COL)) for loc in raw["locales"]]
+        else:
+            locales = [(raw["zh_properties"], raw.get("excel_column", EXCEL_ZH_COL))]
+        jobs.append({
+            "name": raw.get("name", f"job{i}"),
+            "menu_xml": raw["menu_xml"],
+            "en_properties": raw["en_properties"],
+            "locales": locales,
+            "excel": raw.get("excel", EXCEL_FILE),
+            "root_menu_id": raw.get("root_menu_id", ROOT_MENU_ID),
+            "key_filter": str(raw.get("key_filter", KEY_FILTER)),
+        })
+    return jobs
+
+
+def run_job(job, excel_translations, dry_run=False):
+    """Process pool entry point: run one job. Returns (reports, change sets, seconds)."""
+    start = time.perf_counter()
+    reports, change_sets = run_pipeline(job["menu_xml"], job["en_properties"], job["locales"], job["excel"],
+                                        root_menu_id=job["root_menu_id"], key_filter=job["key_filter"],
+                                        excel_translations=excel_translations, dry_run=dry_run)
+    return reports, change_sets, time.perf_counter() - start
+
+
+def job_target_files(job):
+    """Properties files a job may rewrite, normalised so that different spellings of one path compare equal."""
+    paths = [job["en_properties"]] + [path for path, _ in job["locales"]]
+    return {os.path.normcase(os.path.abspath(path)) for path in paths}
+
+
+def group_jobs_by_target(jobs):
+    """
+    Group job indexes so that jobs sharing an EN or locale properties file (directly or through
+    another job) end up in the same group. Groups and the jobs inside them keep manifest order.
+    """
+    parent = list(range(len(jobs)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner = {}
+    for i, job in enumerate(jobs):
+        for path in job_target_files(job):
+            if path in owner:
+                parent[find(i)] = find(owner[path])
+            else:
+                owner[path] = i
+
+    groups = {}
+    for i in range(len(jobs)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
 
-    # 3) Apply the same key renames to ZH (value-agnostic)
-    rename_keys_using_map(ZH_PROPERTIES_FILE, old_to_new_map)
 
-    # 4) Load Excel translations and update ZH values (support old & new keys)
-    excel_translations = load_excel_translations(EXCEL_FILE)
-    update_zh_values_from_excel(ZH_PROPERTIES_FILE, excel_translations, old_to_new_map)
+def run_job_group(group, dry_run=False):
+    """
+    Process pool entry point: run jobs that share target files one after another, so that each job
+    sees the previous job's output. Returns [(result, error message)] in group order.
+    """
+    results = []
+    for job, excel_translations in group:
+        try:
+            results.append((run_job(job, excel_translations, dry_run), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
 
-    # 5) Missing keys report (filtered, and rename-aware)
-    props_keys = collect_properties_keys(ZH_PROPERTIES_FILE) | collect_properties_keys(EN_PROPERTIES_FILE)
-    write_missing_report(excel_translations, props_keys, old_to_new_map)
 
-    print(
-        "✅ Done: keys renamed from menu.xml (PIMS-only) and Chinese values updated from Excel. Missing report written.")
+def run_jobs(jobs, max_workers=None, dry_run=False):
+    """
+    Run jobs in a process pool. Each workbook is loaded once (unfiltered, with the value columns
+    of every job using it) and shared; each job applies its own key filter.
+    Jobs that rewrite the same properties file run serially in one worker, in manifest order.
+    A workbook that fails to load only fails the jobs using it.
+    Writes one consolidated missing report with a per-job Timings sheet (not with dry_run).
+    """
+    workbook_cols = {}
+    for job in jobs:
+        cols = workbook_cols.setdefault(job["excel"], [])
+        cols.extend(col for _, col in job["locales"] if col not in cols)
+    workbooks, workbook_errors = {}, {}
+    for path, cols in workbook_cols.items():
+        try:
+            workbooks[path] = load_excel_translations(path, cols, key_filter="ALL", dry_run=dry_run)
+        except Exception as e:
+            workbook_errors[path] = e
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for indexes in group_jobs_by_target(jobs):
+            group = []
+            for i in indexes:
+                job = jobs[i]
+                if job["excel"] in workbook_errors:
+                    results[i] = (None, str(workbook_errors[job["excel"]]))
+                    continue
+                workbook = workbooks[job["excel"]]
+                group.append((job, {col: workbook[col] for _, col in job["locales"]}))
+            if group:
+                pending = [i for i in indexes if i not in results]
+                futures.append((pending, executor.submit(run_job_group, group, dry_run)))
+
+        for indexes, future in futures:
+            try:
+                results.update(zip(indexes, future.result()))
+            except Exception as e:
+                results.update((i, (None, str(e))) for i in indexes)
+
+    missing_frames, timings = [], []
+    for i, job in enumerate(jobs):
+        result, error = results[i]
+        if error is not None:
+            timings.append([job["name"], None, f"Failed: {error}"])
+            print(f"❌ {job['name']}: {error}")
+            continue
+        reports, change_sets, seconds = result
+        timings.append([job["name"], round(seconds, 3), "OK"])
+        print(f"✅ {job['name']}: {seconds:.2f}s")
+        print_change_sets(change_sets, dry_run)
+        for locale_name, df in reports.items():
+            if not df.empty:
+                missing_frames.append(df.assign(Job=job["name"], Locale=locale_name))
+
+    missing_df = pd.concat(missing_frames, ignore_index=True) if missing_frames \
+        else pd.DataFrame(columns=["Key", "Location", "Job", "Locale"])
+    timings_df = pd.DataFrame(timings, columns=["Job", "Seconds", "Status"])
+    if dry_run:
+        return timings_df
+    with pd.ExcelWriter(OUTPUT_MISSING_FILE) as writer:
+        missing_df[["Job", "Locale", "Key", "Location"]].to_excel(writer, sheet_name="Missing", index=False)
+        timings_df.to_excel(writer, sheet_name="Timings", index=False)
+    return timings_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rename menu keys from menu.xml and update locale values from Excel.")
+    parser.add_argument("--jobs", help="YAML job manifest; without it the CONFIG constants above are used.")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for --jobs.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Write nothing; print the planned changes as a unified diff.")
+    args = parser.parse_args()
+
+    if args.jobs:
+        run_jobs(load_job_manifest(args.jobs), max_workers=args.workers, dry_run=args.dry_run)
+        if not args.dry_run:
+            print(f"✅ Done: batch jobs finished. Consolidated missing report written to {OUTPUT_MISSING_FILE}.")
+    else:
+        missing_reports, planned_changes = run_pipeline(MENU_XML_FILE, EN_PROPERTIES_FILE, LOCALES, EXCEL_FILE,
+                                                        root_menu_id=ROOT_MENU_ID, dry_run=args.dry_run)
+        print_change_sets(planned_changes, args.dry_run)
+        if not args.dry_run:
+            write_missing_report(missing_reports)
+            print(
+                "✅ Done: keys renamed from menu.xml (PIMS-only) and locale values updated from Excel. "
+                "Missing report written.")
@@ -1,50 +1,219 @@
 import os
-import glob
+import argparse
+import json
+import hashlib
+import importlib.util
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
+MANIFEST_VERSION = 1
 
-def extract_properties_to_list(directory_paths, module_name, filename_filter=None):
+# Directory listing on network shares is latency-bound, so more threads than cores pay off
+DISCOVERY_WORKERS = 16
+
+OUTPUT_FORMATS = ["xlsx", "csv", "jsonl", "parquet"]
+PARQUET_ENGINES = ("pyarrow", "fastparquet")  # pandas uses whichever is installed
+
+
+def load_manifest(manifest_path):
+    """
+    Load the manifest written by the previous run.
+
+    Returns:
+        dict: {file_path -> {"mtime_ns", "size", "sha1", "entries"}}, empty if there was no previous run.
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+
+
+def save_manifest(manifest_path, manifest):
+    """
+    Persist content hashes and extracted rows so the next run only re-parses changed files.
+    """
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "files": manifest}, f, ensure_ascii=False)
+
+
+def parse_properties_content(content):
+    """
+    Returns list of [key, value] pairs from the text of a properties file.
+    """
+    entries = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if '=' in line:
+            key, value = line.split('=', 1)
+            entries.append([key.strip(), value.strip()])
+    return entries
+
+
+def load_properties_entry(file_path, previous_entry=None):
+    """
+    Returns the manifest entry for file_path, reusing previous_entry when the file is unchanged.
+
+    The (mtime, size) pair is checked first so unchanged files are not even read; if it differs the
+    content hash decides whether the file really has to be parsed again.
+    """
+    stat = os.stat(file_path)
+    if previous_entry and previous_entry.get("mtime_ns") == stat.st_mtime_ns \
+            and previous_entry.get("size") == stat.st_size:
+        return previous_entry
+
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    sha1 = hashlib.sha1(raw).hexdigest()
+
+    if previous_entry and previous_entry.get("sha1") == sha1:
+        entries = previous_entry["entries"]
+    else:
+        entries = parse_properties_content(raw.decode('utf-8'))
+
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": sha1, "entries": entries}
+
+
+def scan_directory(directory_path, filename_filter=None):
+    """
+    Lists one directory.
+
+    Returns:
+        tuple: (matching *_resource.properties file paths, subdirectory paths)
+    """
+    files, subdirectories = [], []
+    try:
+        with os.scandir(directory_path) as it:
+            for dir_entry in it:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(dir_entry.path)
+                elif dir_entry.name.lower().endswith("_resource.properties") \
+                        and (filename_filter is None or filename_filter(dir_entry.name)):
+                    files.append(dir_entry.path)
+    except OSError as e:
+        print(f"Skipping unreadable directory {directory_path}: {e}")
+    return files, subdirectories
+
+
+def discover_resource_files(directory_paths, filename_filter=None, max_workers=DISCOVERY_WORKERS):
     """
-    Extracts key-value pairs from *_resource.properties files in one or more directories.
+    Recursively finds *_resource.properties files under every directory in directory_paths.
+    Subdirectories are listed concurrently as soon as their parent listing returns.
+
+    Returns:
+        list[str]: File paths that pass filename_filter, sorted within each of directory_paths (in the given order).
+    """
+    found = [[] for _ in directory_paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # future -> index of the directory_paths root it belongs to
+        pending = {executor.submit(scan_directory, path, filename_filter): i for i, path in enumerate(directory_paths)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                root_index = pending.pop(future)
+                files, subdirectories = future.result()
+                found[root_index].extend(files)
+                for path in subdirectories:
+                    pending[executor.submit(scan_directory, path, filename_filter)] = root_index
+
+    seen = set()
+    ordered = []
+    for files in found:
+        for file_path in sorted(files):
+            if file_path not in seen:
+                seen.add(file_path)
+                ordered.append(file_path)
+    return ordered
+
+
+def extract_properties_to_list(directory_paths, module_name, filename_filter=None,
+                               previous_manifest=None, current_manifest=None, group_by_eng_value=False):
+    """
+    Extracts key-value pairs from *_resource.properties files in one or more directory trees.
 
     Args:
         directory_paths (list[str]): Paths to search.
         module_name (str): Value to put in the 'Module' column.
         filename_filter (callable, optional): Function that receives filename and returns True/False.
+        previous_manifest (dict, optional): Manifest of the previous run; unchanged files are not re-parsed.
+        current_manifest (dict, optional): Receives the manifest entry of every file visited in this run.
+        group_by_eng_value (bool): Emit one row per unique ENG VALUE, with its occurrence count and the
+            resource files it appears in, instead of one row per property line.
 
     Returns:
         list of dict: Extracted properties data.
     """
     data = []
+    groups = {}  # ENG VALUE -> [occurrences, {resource name: None}] (dicts keep first-seen order)
+    if previous_manifest is None:
+        previous_manifest = {}
+
+    # *_resource.properties suffix and custom filter are applied while walking the trees
+    for file_path in discover_resource_files(directory_paths, filename_filter):
+        resource_name = os.path.basename(file_path)
+        entry = load_properties_entry(file_path, previous_manifest.get(file_path))
+        if current_manifest is not None:
+            current_manifest[file_path] = entry
 
-    for directory_path in directory_paths:
-        all_files = glob.glob(os.path.join(directory_path, "*.properties"), recursive=True)
-
-        # Filter for *_resource.properties only
-        filtered_files = [f for f in all_files if f.lower().endswith("_resource.properties")]
-
-        # Apply optional custom filter
-        if filename_filter:
-            filtered_files = [f for f in filtered_files if filename_filter(os.path.basename(f))]
-
-        for file_path in filtered_files:
-            resource_name = os.path.basename(file_path)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        data.append({
-                            "Module": module_name,
-                            "ENG VALUE": value.strip(),
-                            "ZH VALUE": "",
-                            "RESOURCE PROPERTIES NAME": resource_name
-                        })
+        for key, value in entry["entries"]:
+            if group_by_eng_value:
+                group = groups.get(value)
+                if group is None:
+                    group = groups[value] = [0, {}]
+                group[0] += 1
+                group[1][resource_name] = None
+                continue
+            data.append({
+                "Module": module_name,
+                "ENG VALUE": value,
+                "ZH VALUE": "",
+                "RESOURCE PROPERTIES NAME": resource_name
+            })
+
+    if group_by_eng_value:
+        for value, (occurrences, resource_names) in groups.items():
+            data.append({
+                "Module": module_name,
+                "ENG VALUE": value,
+                "ZH VALUE": "",
+                "OCCURRENCES": occurrences,
+                "RESOURCE PROPERTIES NAME": ", ".join(resource_names)
+            })
     return data
 
 
+def build_delta_rows(previous_manifest, current_manifest):
+    """
+    Lists keys added, removed or changed since the previous run.
+    Files whose content hash did not change are skipped without comparing their entries.
+    """
+    rows = []
+    for file_path in sorted(set(previous_manifest) | set(current_manifest)):
+        old_entry = previous_manifest.get(file_path)
+        new_entry = current_manifest.get(file_path)
+        if old_entry and new_entry and old_entry.get("sha1") == new_entry.get("sha1"):
+            continue
+
+        old_values = dict(old_entry["entries"]) if old_entry else {}
+        new_values = dict(new_entry["entries"]) if new_entry else {}
+        resource_name = os.path.basename(file_path)
+
+        for key, value in new_values.items():
+            if key not in old_values:
+                rows.append(["Added", key, "", value, resource_name])
+            elif old_values[key] != value:
+                rows.append(["Changed", key, old_values[key], value, resource_name])
+        for key, value in old_values.items():
+            if key not in new_values:
+                rows.append(["Removed", key, value, "", resource_name])
+    return rows
+
+
 def autofit_columns(writer, df, sheet_name):
     """
     Auto-adjust Excel columns to fit longest text in each column.
@@ -53,12 +222,58 @@ def autofit_columns(writer, df, sheet_name):
     for idx, col in enumerate(df.columns):
         # Find max length in column + length of column header
         max_len = max(
-            df[col].astype(str).map(len).max(),
+            df[col].astype(str).map(len).max() if not df.empty else 0,
             len(col)
         ) + 2  # add some padding
         worksheet.set_column(idx, idx, max_len)
 
 
+def write_sheets(sheets, output_base, output_format):
+    """
+    Write every sheet in the requested format.
+
+    Args:
+        sheets (dict[str, DataFrame]): Sheet name -> data, in output order.
+        output_base (str): Output path without extension.
+        output_format (str): One of OUTPUT_FORMATS. xlsx writes one workbook with one sheet per entry;
+            the other formats write one file per sheet into the output_base directory.
+
+    Returns:
+        str: Path of the workbook or directory that was written.
+    """
+    if output_format == "xlsx":
+        output_excel = f"{output_base}.xlsx"
+        with pd.ExcelWriter(output_excel, engine='xlsxwriter') as writer:
+            for sheet_name, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+                autofit_columns(writer, df, sheet_name)
+        return output_excel
+
+    os.makedirs(output_base, exist_ok=True)
+    for sheet_name, df in sheets.items():
+        file_path = os.path.join(output_base, f"{sheet_name}.{output_format}")
+        if output_format == "csv":
+            df.to_csv(file_path, index=False, encoding='utf-8')
+        elif output_format == "jsonl":
+            df.to_json(file_path, orient="records", lines=True, force_ascii=False)
+        elif output_format == "parquet":
+            df.to_parquet(file_path, index=False)
+        else:
+            raise ValueError(f"Unsupported output format: {output_format}")
+    return output_base
+
+
+parser = argparse.ArgumentParser(description="Extract qhs *_resource.properties values that need a translation.")
+parser.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=["xlsx"],
+                    help="Output format(s) to write (default: xlsx).")
+parser.add_argument("--aggregate", action="store_true",
+                    help="Write one row per unique ENG VALUE with its occurrence count and resource files.")
+args = parser.parse_args()
+
+# Check optional engines before anything is scanned or written
+if "parquet" in args.formats and not any(importlib.util.find_spec(engine) for engine in PARQUET_ENGINES):
+    parser.error("--formats parquet needs pyarrow or fastparquet (pip install pyarrow).")
+
 # Paths
 bd_paths = [
     r"C:\Users\admin\Workspace\pj-hkpf-pics3-revamp2-boot-up-application-with-ant-gaussdb\pwing_web\JavaSourceGeneral\resource\bd",
@@ -69,10 +284,20 @@ bo_paths = [
     r"C:\Users\admin\Workspace\pj-hkpf-pics3-revamp2-boot-up-application-with-ant-gaussdb\pwing_web\JavaSource\resource\bo"
 ]
 
+# Output files and the manifest of the previous run
+output_base = os.path.join(os.getcwd(), "QHS_RESOURCES_PWING")
+manifest_path = os.path.join(os.getcwd(), "QHS_RESOURCES_PWING.manifest.json")
+
+previous_manifest = load_manifest(manifest_path)
+current_manifest = {}
+
 # Extract Bd (only from bd folder)
 qhs_data = extract_properties_to_list(
     bd_paths,
     module_name="qhs",
+    previous_manifest=previous_manifest,
+    current_manifest=current_manifest,
+    group_by_eng_value=args.aggregate,
     filename_filter=lambda fn: (
             "qhs" in fn.lower()
     )
@@ -82,6 +307,9 @@ qhs_data = extract_properties_to_list(
 bo_data = extract_properties_to_list(
     bo_paths,
     module_name="qhs",
+    previous_manifest=previous_manifest,
+    current_manifest=current_manifest,
+    group_by_eng_value=args.aggregate,
     filename_filter=lambda fn: (
             "qhs" in fn.lower()
             and not fn.lower().startswith("baseqhs")
@@ -93,6 +321,9 @@ bo_data = extract_properties_to_list(
 searchbo_data = extract_properties_to_list(
     bo_paths,
     module_name="qhs",
+    previous_manifest=previous_manifest,
+    current_manifest=current_manifest,
+    group_by_eng_value=args.aggregate,
     filename_filter=lambda fn:
     (
             "qhs" in fn.lower()
@@ -104,30 +335,31 @@ searchbo_data = extract_properties_to_list(
 basebo_data = extract_properties_to_list(
     bo_paths,
     module_name="qhs",
+    previous_manifest=previous_manifest,
+    current_manifest=current_manifest,
+    group_by_eng_value=args.aggregate,
     filename_filter=lambda fn: fn.lower().startswith("baseqhs")
 )
 
 # Create DataFrames
-df_qhs = pd.DataFrame(qhs_data, columns=["Module", "ENG VALUE", "ZH VALUE", "RESOURCE PROPERTIES NAME"])
-df_bo = pd.DataFrame(bo_data, columns=["Module", "ENG VALUE", "ZH VALUE", "RESOURCE PROPERTIES NAME"])
-df_searchbo = pd.DataFrame(searchbo_data, columns=["Module", "ENG VALUE", "ZH VALUE", "RESOURCE PROPERTIES NAME"])
-df_basebo = pd.DataFrame(basebo_data, columns=["Module", "ENG VALUE", "ZH VALUE", "RESOURCE PROPERTIES NAME"])
-
-# Output Excel file
-output_excel = os.path.join(os.getcwd(), "QHS_RESOURCES_PWING.xlsx")
-
-# Write multiple sheets
-with pd.ExcelWriter(output_excel, engine='xlsxwriter') as writer:
-    df_qhs.to_excel(writer, sheet_name="Bd", index=False)
-    autofit_columns(writer, df_qhs, "Bd")
-
-    df_bo.to_excel(writer, sheet_name="Bo", index=False)
-    autofit_columns(writer, df_bo, "Bo")
+if args.aggregate:
+    sheet_columns = ["Module", "ENG VALUE", "ZH VALUE", "OCCURRENCES", "RESOURCE PROPERTIES NAME"]
+else:
+    sheet_columns = ["Module", "ENG VALUE", "ZH VALUE", "RESOURCE PROPERTIES NAME"]
+df_qhs = pd.DataFrame(qhs_data, columns=sheet_columns)
+df_bo = pd.DataFrame(bo_data, columns=sheet_columns)
+df_searchbo = pd.DataFrame(searchbo_data, columns=sheet_columns)
+df_basebo = pd.DataFrame(basebo_data, columns=sheet_columns)
+df_delta = pd.DataFrame(build_delta_rows(previous_manifest, current_manifest),
+                        columns=["CHANGE", "KEY", "OLD ENG VALUE", "NEW ENG VALUE", "RESOURCE PROPERTIES NAME"])
 
-    df_searchbo.to_excel(writer, sheet_name="SearchBo", index=False)
-    autofit_columns(writer, df_searchbo, "SearchBo")
+# Write multiple sheets (one workbook sheet or one file per sheet)
+sheets = {"Bd": df_qhs, "Bo": df_bo, "SearchBo": df_searchbo, "BaseBo": df_basebo, "Delta": df_delta}
+for output_format in args.formats:
+    output_path = write_sheets(sheets, output_base, output_format)
+    print(f"{output_format} output with sheets 'Bd', 'Bo', 'SearchBo', 'BaseBo' and 'Delta' generated at: {output_path}")
 
-    df_basebo.to_excel(writer, sheet_name="BaseBo", index=False)
-    autofit_columns(writer, df_basebo, "BaseBo")
+# Only remember this run once all outputs were written successfully
+save_manifest(manifest_path, current_manifest)
 
-print(f"Excel file with sheets 'Bd', 'Bo', 'SearchBo', and 'BaseBo' generated at: {output_excel}")
+print(f"Delta since last run: {len(df_delta)} key(s) added, removed or changed.")